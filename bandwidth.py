@@ -0,0 +1,81 @@
+# bandwidth.py
+import time
+import threading
+
+import requests
+
+import net
+
+PROBE_BYTES = 256 * 1024
+
+
+class ThroughputEstimator:
+    """Link throughput estimate for "Auto" quality
+
+    Samples (bytes/s) come from the stream proxy's recent reads or from a
+    short range-request probe and are smoothed with an EWMA. The usable
+    share of that estimate, `safety`, shrinks after a video that stalled
+    and grows back slowly after videos that played cleanly, so quality
+    steps down and up between videos.
+    """
+
+    def __init__(self, alpha=0.3, safety=0.7, min_safety=0.3, max_safety=0.8):
+        self.alpha = alpha
+        self.safety = safety
+        self.min_safety = min_safety
+        self.max_safety = max_safety
+        self._estimate = None
+        self._lock = threading.Lock()
+
+    def observe(self, bytes_per_second):
+        if not bytes_per_second:
+            return
+        with self._lock:
+            if self._estimate is None:
+                self._estimate = bytes_per_second
+            else:
+                self._estimate += self.alpha * (bytes_per_second - self._estimate)
+
+    def estimate(self):
+        return self._estimate
+
+    def budget(self):
+        """Bytes/s a stream may need to play without rebuffering, or None"""
+        with self._lock:
+            if self._estimate is None:
+                return None
+            return self._estimate * self.safety
+
+    def video_finished(self, stalls):
+        """Adjust the safety factor from the stall count of the last video"""
+        with self._lock:
+            if stalls:
+                self.safety = max(self.min_safety, self.safety * 0.7)
+            else:
+                self.safety = min(self.max_safety, self.safety + 0.05)
+
+    def probe(self, url, session=None, timeout=3):
+        """Time a small range request against url and record the result"""
+        session = session or net.session()
+        start = time.perf_counter()
+        try:
+            response = session.get(
+                url, headers={'Range': f"bytes=0-{PROBE_BYTES - 1}", 'Accept-Encoding': 'identity'},
+                stream=True, timeout=timeout)
+            with response:
+                if response.status_code not in (200, 206):
+                    return None
+                # iter_content turns urllib3 read errors (ProtocolError,
+                # ReadTimeoutError) into RequestExceptions; raw.read() does not
+                size = 0
+                for chunk in response.iter_content(64 * 1024):
+                    size += len(chunk)
+                    if size >= PROBE_BYTES:
+                        break
+        except requests.RequestException:
+            return None
+        elapsed = time.perf_counter() - start
+        if size and elapsed > 0:
+            self.observe(size / elapsed)
+            return size / elapsed
+        return None
@@ -0,0 +1,78 @@
+# benchmarks/bench_extractor.py
+"""Compare the streaming ytInitialData extractor with the old BeautifulSoup path
+
+Usage: python benchmarks/bench_extractor.py [fixture.html ...]
+
+Reports best-of-N parse time and tracemalloc peak memory for each fixture.
+The BeautifulSoup path is skipped when bs4 is not installed.
+"""
+import os
+import sys
+import glob
+import json
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractor import iter_video_renderers
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+CHUNK_SIZE = 64 * 1024
+REPEAT = 5
+
+
+def legacy_parse(page):
+    """The search_videos parsing path before the streaming extractor"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(page.decode('utf-8'), 'html.parser')
+    for script in soup.find_all('script'):
+        if 'var ytInitialData = ' in str(script):
+            data = str(script).split(
+                'var ytInitialData = ')[1].split(';</script>')[0]
+            json_data = json.loads(data)
+            items = json_data['contents']['twoColumnSearchResultsRenderer']['primaryContents'][
+                'sectionListRenderer']['contents'][0]['itemSectionRenderer']['contents']
+            return [item['videoRenderer'] for item in items if 'videoRenderer' in item]
+    return []
+
+
+def streaming_parse(page):
+    chunks = (page[i:i + CHUNK_SIZE] for i in range(0, len(page), CHUNK_SIZE))
+    return list(iter_video_renderers(chunks))
+
+
+def measure(parse, page):
+    best = float('inf')
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        items = parse(page)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    parse(page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, len(items)
+
+
+def main(paths):
+    parsers = [("streaming", streaming_parse)]
+    try:
+        import bs4  # noqa: F401
+        parsers.insert(0, ("beautifulsoup", legacy_parse))
+    except ImportError:
+        print("bs4 not installed, skipping the BeautifulSoup baseline")
+
+    for path in paths:
+        with open(path, 'rb') as f:
+            page = f.read()
+        print(f"{os.path.basename(path)} ({len(page) // 1024} KB)")
+        for name, parse in parsers:
+            seconds, peak, count = measure(parse, page)
+            print(f"  {name:<14} {seconds * 1000:8.2f} ms  peak {peak / 1024:8.0f} KB  {count} videos")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.html"))))
@@ -0,0 +1,73 @@
+# benchmarks/bench_proxy.py
+"""Read-ahead proxy against a local, throttled HTTP server
+
+Usage: python benchmarks/bench_proxy.py [--size MB] [--rate MBPS]
+
+Serves a generated sample file from the local stand-in server
+(standin.py), which supports byte ranges and limits every connection to
+`rate` MB/s, then reads it once directly and once through StreamProxy.
+Checks that the proxied bytes match, that a seek into the middle is
+served, and prints timings plus the proxy's throughput stats.
+"""
+import os
+import sys
+import time
+import hashlib
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from proxy import StreamProxy
+from standin import start_standin
+
+
+def start_server(payload, rate):
+    server, base = start_standin(rate, payload)
+    return server, base + "/sample.bin"
+
+
+def timed_read(url, headers=None):
+    start = time.perf_counter()
+    data = requests.get(url, headers=headers or {}, timeout=60).content
+    return time.perf_counter() - start, data
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=float, default=16, help="sample size in MB")
+    parser.add_argument("--rate", type=float, default=4, help="per-connection limit in MB/s")
+    args = parser.parse_args()
+
+    payload = os.urandom(int(args.size * 1024 * 1024))
+    server, url = start_server(payload, args.rate * 1024 * 1024)
+    proxy = StreamProxy().start()
+    try:
+        direct_time, direct = timed_read(url)
+        proxied_url = proxy.register(url)
+        proxied_time, proxied = timed_read(proxied_url)
+
+        middle = len(payload) // 2
+        seek_time, tail = timed_read(proxied_url, {'Range': f"bytes={middle}-{middle + 65535}"})
+
+        ok = (hashlib.sha1(direct).digest() == hashlib.sha1(payload).digest()
+              == hashlib.sha1(proxied).digest() and tail == payload[middle:middle + 65536])
+        print(f"sample {len(payload) / 1024 / 1024:.0f} MB at {args.rate} MB/s per connection")
+        print(f"  direct   {direct_time:6.2f} s")
+        print(f"  proxied  {proxied_time:6.2f} s")
+        print(f"  seek     {seek_time * 1000:6.1f} ms (cached range)")
+        stats = proxy.stats()
+        print(f"  upstream {stats['upstream_requests']} requests, "
+              f"{stats['throughput'] / 1024 / 1024:.1f} MB/s, "
+              f"{stats['memory_hits']} memory hits, {stats['misses']} misses")
+        print("  content  " + ("OK" if ok else "MISMATCH"))
+        if not ok:
+            sys.exit(1)
+    finally:
+        proxy.stop()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# benchmarks/bench_results_list.py
+"""Render time and memory of the results list for 50/500/5000 rows
+
+Usage: python benchmarks/bench_results_list.py [--legacy]
+
+Measures ResultsList.set_records plus a full scroll from top to bottom.
+With --legacy the old layout (one CTkButton per result packed into a
+CTkScrollableFrame) is measured too; it is slow at 5000 rows.
+Needs a display (on Linux run under xvfb-run).
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import customtkinter as ctk
+
+from gui import ResultsList
+from settings import Settings
+
+SIZES = (50, 500, 5000)
+
+
+def make_records(count):
+    return [
+        {'video_id': f"vid{i:08d}", 'title': f"Result number {i} with a reasonably long title",
+         'duration': f"{i % 60}:{i % 59:02d}", 'channel': f"Channel {i % 97}"}
+        for i in range(count)
+    ]
+
+
+def bench_virtual(window, records):
+    results = ResultsList(window, on_select=lambda record: None, height=200)
+    window.update()
+    start = time.perf_counter()
+    results.set_records(records)
+    window.update()
+    render = time.perf_counter() - start
+
+    start = time.perf_counter()
+    while results.first + results.visible_rows < len(records):
+        results.scroll_by(results.visible_rows)
+        window.update_idletasks()
+    scroll = time.perf_counter() - start
+    results.destroy()
+    return render, scroll
+
+
+def bench_legacy(window, records):
+    frame = ctk.CTkScrollableFrame(window, height=200)
+    frame.pack(pady=10, padx=10, fill="x")
+    window.update()
+    start = time.perf_counter()
+    for record in records:
+        ctk.CTkButton(
+            frame,
+            text=record['title'],
+            height=40,
+            fg_color=Settings.BUTTON_NORMAL_COLOR,
+            hover_color=Settings.BUTTON_HOVER_COLOR
+        ).pack(pady=5, padx=10, fill="x")
+    window.update()
+    render = time.perf_counter() - start
+    frame.destroy()
+    return render, None
+
+
+def main():
+    layouts = [("virtual", bench_virtual)]
+    if "--legacy" in sys.argv:
+        layouts.append(("legacy", bench_legacy))
+
+    window = ctk.CTk()
+    window.geometry(Settings.WINDOW_SIZE)
+    for count in SIZES:
+        records = make_records(count)
+        for name, bench in layouts:
+            tracemalloc.start()
+            render, scroll = bench(window, records)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            line = f"{name:<8} {count:>5} rows  render {render * 1000:8.1f} ms"
+            if scroll is not None:
+                line += f"  full scroll {scroll * 1000:8.1f} ms"
+            print(line + f"  peak {peak / 1024:8.0f} KB")
+    window.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# benchmarks/bench_startup.py
+"""Import-time report for the modules loaded before the window appears
+
+Usage: python benchmarks/bench_startup.py [--budget MS] [--top N]
+
+Runs `python -X importtime -c "import player"` in a fresh interpreter,
+prints the slowest modules by cumulative time and exits with status 1
+when importing `player` takes longer than the budget. Heavy modules that
+are meant to load lazily (yt_dlp, vlc with libvlc, PIL) are reported if
+they show up at all.
+"""
+import os
+import sys
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_MS = 600
+LAZY_MODULES = ('yt_dlp', 'vlc', 'PIL')
+
+
+def import_times(module):
+    """{module: (self_us, cumulative_us)} as reported by -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(result.stderr.strip().splitlines()[-1])
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget", type=float, default=BUDGET_MS, help="budget for `import player` in ms")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    times = import_times("player")
+    total_ms = times["player"][1] / 1000
+
+    print(f"{'module':<40} {'self ms':>9} {'cumulative ms':>14}")
+    top_level = {name: t for name, t in times.items() if "." not in name}
+    for name, (self_us, cumulative_us) in sorted(
+            top_level.items(), key=lambda item: -item[1][1])[:args.top]:
+        print(f"{name:<40} {self_us / 1000:9.1f} {cumulative_us / 1000:14.1f}")
+
+    eager = [name for name in LAZY_MODULES if name in times]
+    if eager:
+        print(f"\nWarning: imported at startup although meant to be lazy: {', '.join(eager)}")
+
+    print(f"\nimport player: {total_ms:.0f} ms (budget {args.budget:.0f} ms)")
+    if total_ms > args.budget or eager:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+# benchmarks/make_fixtures.py
+"""Generate the saved fixtures used by the benchmarks
+
+The results pages mimic the layout of youtube.com/results: a large <head>
+with inline scripts and styles, the ytInitialData script with
+videoRenderer items, shelves and a continuation item, followed by more
+inline scripts. continuation.json is a youtubei search continuation
+response, info_dicts.json holds compact yt-dlp info dicts (as returned by
+resolver.compact_info) whose stream URLs point at the stand-in server,
+and sample.wav is a short tone for playback benchmarks.
+"""
+import os
+import math
+import json
+import wave
+import random
+import string
+import struct
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def random_text(rng, words):
+    return " ".join(
+        "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 9)))
+        for _ in range(words)
+    ).capitalize()
+
+
+def video_id(rng):
+    alphabet = string.ascii_letters + string.digits + "-_"
+    return "".join(rng.choice(alphabet) for _ in range(11))
+
+
+def thumbnails(vid):
+    return {"thumbnails": [
+        {"url": f"https://i.ytimg.com/vi/{vid}/hq720.jpg?sqp=-oaymwEcCOgCEMoBSFXyq4qpAw4IARUAAIhCGAFwAcABBg==&rs=AOn4CLBx",
+         "width": w, "height": h}
+        for w, h in ((360, 202), (720, 404))
+    ]}
+
+
+def video_renderer(rng):
+    vid = video_id(rng)
+    title = random_text(rng, rng.randint(4, 12))
+    channel = random_text(rng, rng.randint(1, 3))
+    minutes = rng.randint(0, 59)
+    seconds = rng.randint(0, 59)
+    runs = [{"text": random_text(rng, rng.randint(3, 10))} for _ in range(rng.randint(2, 6))]
+    return {"videoRenderer": {
+        "videoId": vid,
+        "thumbnail": thumbnails(vid),
+        "title": {"runs": [{"text": title}], "accessibility": {
+            "accessibilityData": {"label": f"{title} by {channel} {minutes} minutes"}}},
+        "longBylineText": {"runs": [{"text": channel, "navigationEndpoint": {
+            "browseEndpoint": {"browseId": "UC" + video_id(rng) * 2, "canonicalBaseUrl": f"/@{channel}"}}}]},
+        "publishedTimeText": {"simpleText": f"{rng.randint(1, 11)} months ago"},
+        "lengthText": {"simpleText": f"{minutes}:{seconds:02d}"},
+        "viewCountText": {"simpleText": f"{rng.randint(1000, 9999999):,} views"},
+        "navigationEndpoint": {
+            "clickTrackingParams": "".join(rng.choice(string.ascii_letters) for _ in range(120)),
+            "commandMetadata": {"webCommandMetadata": {"url": f"/watch?v={vid}", "webPageType": "WEB_PAGE_TYPE_WATCH"}},
+            "watchEndpoint": {"videoId": vid, "params": "qgcJCAE%3D", "watchEndpointSupportedOnesieConfig": {
+                "html5PlaybackOnesieConfig": {"commonConfig": {
+                    "url": f"https://rr3---sn-example.googlevideo.com/initplayback?source=youtube&oeis=1&c=WEB&oad=3200&ovd=3200&oaad=11000&oavd=11000&ocs=700&oewis=1&oputc=1&ofpcc=1&msp=1&odepv=1&id={vid}"}}}},
+        },
+        "ownerText": {"runs": [{"text": channel}]},
+        "shortBylineText": {"runs": [{"text": channel}]},
+        "detailedMetadataSnippets": [{"snippetText": {"runs": runs}}],
+        "ownerBadges": [{"metadataBadgeRenderer": {"icon": {"iconType": "CHECK_CIRCLE_THICK"}, "style": "BADGE_STYLE_TYPE_VERIFIED"}}],
+        "trackingParams": "".join(rng.choice(string.ascii_letters) for _ in range(60)),
+        "showActionMenu": False,
+        "menu": {"menuRenderer": {"items": [
+            {"menuServiceItemRenderer": {"text": {"runs": [{"text": label}]}, "icon": {"iconType": icon}}}
+            for label, icon in (("Add to queue", "ADD_TO_QUEUE_TAIL"), ("Save to Watch later", "WATCH_LATER"),
+                                ("Save to playlist", "PLAYLIST_ADD"), ("Share", "SHARE"))
+        ]}},
+        "channelThumbnailSupportedRenderers": {"channelThumbnailWithLinkRenderer": {"thumbnail": thumbnails(vid)}},
+        "thumbnailOverlays": [{"thumbnailOverlayTimeStatusRenderer": {
+            "text": {"simpleText": f"{minutes}:{seconds:02d}"}, "style": "DEFAULT"}}],
+    }}
+
+
+def initial_data(rng, videos):
+    items = [video_renderer(rng) for _ in range(videos)]
+    shelf = {"shelfRenderer": {"title": {"simpleText": "People also watched"}, "content": {
+        "verticalListRenderer": {"items": [video_renderer(rng) for _ in range(4)]}}}}
+    items.insert(min(5, len(items)), shelf)
+    return {
+        "responseContext": {"serviceTrackingParams": [
+            {"service": "GFEEDBACK", "params": [{"key": "logged_in", "value": "0"}]}]},
+        "estimatedResults": str(rng.randint(10 ** 5, 10 ** 7)),
+        "contents": {"twoColumnSearchResultsRenderer": {"primaryContents": {"sectionListRenderer": {
+            "contents": [
+                {"itemSectionRenderer": {"contents": items}},
+                {"continuationItemRenderer": {"trigger": "CONTINUATION_TRIGGER_ON_ITEM_SHOWN",
+                    "continuationEndpoint": {"continuationCommand": {
+                        "token": "EpIDEgZweXRob24a" + "".join(rng.choice(string.ascii_letters) for _ in range(200)),
+                        "request": "CONTINUATION_REQUEST_TYPE_SEARCH"}}}},
+            ]}}}},
+    }
+
+
+def filler_script(rng, size):
+    body = ";".join(f"var {random_text(rng, 1).lower()}={rng.randint(0, 10 ** 6)}" for _ in range(size // 16))
+    return f'<script nonce="abc">{body}</script>\n'
+
+
+def results_page(seed, videos=20):
+    rng = random.Random(seed)
+    head = "".join(filler_script(rng, 40_000) for _ in range(5))
+    style = "<style>" + "".join(f".c{i}{{margin:{i % 9}px}}" for i in range(6000)) + "</style>\n"
+    data = json.dumps(initial_data(rng, videos), separators=(",", ":"))
+    return (
+        "<!DOCTYPE html><html><head><title>results - YouTube</title>\n"
+        + head + style
+        + "</head><body>\n"
+        + f'<script nonce="abc">var ytInitialData = {data};</script>\n'
+        + "".join(filler_script(rng, 30_000) for _ in range(3))
+        + "</body></html>\n"
+    )
+
+
+def continuation_response(seed, videos=20):
+    rng = random.Random(seed)
+    items = [{"itemSectionRenderer": {"contents": [video_renderer(rng) for _ in range(videos)]}},
+             {"continuationItemRenderer": {"continuationEndpoint": {"continuationCommand": {
+                 "token": "EpIDEgZweXRob24a" + "".join(rng.choice(string.ascii_letters) for _ in range(200))}}}}]
+    return {"onResponseReceivedCommands": [{"appendContinuationItemsAction": {"continuationItems": items}}]}
+
+
+# (itag, height, fps, vcodec, acodec, tbr, protocol) of a typical format table
+FORMAT_TABLE = [
+    ("139", None, None, "none", "mp4a.40.5", 49, "https"),
+    ("140", None, None, "none", "mp4a.40.2", 129, "https"),
+    ("251", None, None, "none", "opus", 135, "https"),
+    ("18", 360, 30, "avc1.42001E", "mp4a.40.2", 560, "https"),
+    ("160", 144, 30, "avc1.4d400c", "none", 110, "https"),
+    ("133", 240, 30, "avc1.4d4015", "none", 240, "https"),
+    ("134", 360, 30, "avc1.4d401e", "none", 420, "https"),
+    ("135", 480, 30, "avc1.4d401f", "none", 780, "https"),
+    ("136", 720, 30, "avc1.4d401f", "none", 1500, "https"),
+    ("137", 1080, 30, "avc1.640028", "none", 2900, "https"),
+    ("243", 360, 30, "vp9", "none", 380, "https"),
+    ("247", 720, 30, "vp9", "none", 1300, "https"),
+    ("248", 1080, 30, "vp9", "none", 2600, "https"),
+    ("298", 720, 60, "avc1.4d4020", "none", 2300, "https"),
+    ("299", 1080, 60, "avc1.64002a", "none", 4300, "https"),
+    ("313", 2160, 30, "vp9", "none", 17000, "https"),
+    ("93", 360, 30, "avc1.4D401E", "mp4a.40.2", 700, "m3u8_native"),
+    ("95", 720, 30, "avc1.4D401F", "mp4a.40.2", 2600, "m3u8_native"),
+]
+
+
+def info_dict(rng):
+    vid = video_id(rng)
+    duration = rng.randint(60, 3600)
+    formats = []
+    for itag, height, fps, vcodec, acodec, tbr, protocol in FORMAT_TABLE:
+        formats.append({
+            "format_id": itag,
+            # {base} is replaced with the stand-in server address when loaded
+            "url": f"{{base}}/media/sample.wav?id={vid}&itag={itag}&expire=4102444800",
+            "ext": "webm" if "vp9" in vcodec or acodec == "opus" else "mp4",
+            "protocol": protocol,
+            "width": height * 16 // 9 if height else None,
+            "height": height,
+            "fps": fps,
+            "vcodec": vcodec,
+            "acodec": acodec,
+            "tbr": tbr * rng.uniform(0.8, 1.2),
+            "vbr": None,
+            "abr": tbr if vcodec == "none" else None,
+            "filesize": int(tbr * 1000 / 8 * duration) if protocol == "https" else None,
+            "filesize_approx": None,
+        })
+    rng.shuffle(formats)
+    return {"id": vid, "title": random_text(rng, rng.randint(4, 12)), "duration": duration,
+            "url": None, "formats": formats}
+
+
+def write_wav(path, seconds=2.0, rate=22050):
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(b"".join(
+            struct.pack("<h", int(8000 * math.sin(2 * math.pi * 440 * i / rate)))
+            for i in range(int(seconds * rate))))
+
+
+def main():
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    for name, seed, videos in (("search_results.html", 1, 20), ("search_results_large.html", 2, 60)):
+        path = os.path.join(FIXTURES_DIR, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(results_page(seed, videos))
+        print(f"{path}: {os.path.getsize(path) // 1024} KB")
+
+    path = os.path.join(FIXTURES_DIR, "continuation.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(continuation_response(3), f, separators=(",", ":"))
+    print(f"{path}: {os.path.getsize(path) // 1024} KB")
+
+    rng = random.Random(4)
+    path = os.path.join(FIXTURES_DIR, "info_dicts.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([info_dict(rng) for _ in range(20)], f, separators=(",", ":"))
+    print(f"{path}: {os.path.getsize(path) // 1024} KB")
+
+    path = os.path.join(FIXTURES_DIR, "sample.wav")
+    write_wav(path)
+    print(f"{path}: {os.path.getsize(path) // 1024} KB")
+
+
+if __name__ == "__main__":
+    main()
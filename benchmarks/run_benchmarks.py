@@ -0,0 +1,244 @@
+# benchmarks/run_benchmarks.py
+"""Offline benchmark suite against the local stand-in server
+
+Usage: python benchmarks/run_benchmarks.py [--repeat N] [--output FILE]
+                                           [--baseline FILE] [--tolerance 0.25]
+
+Runs without network access: search pages, continuation responses and
+stream data come from standin.py, format tables from
+fixtures/info_dicts.json (run make_fixtures.py first). Cases:
+
+    search             fetch_results / fetch_continuation over HTTP, plus
+                       in-memory parse throughput of the results page
+    format_selection   FormatIndex construction and stream choice
+    results_list       ResultsList render and scroll (needs a display)
+    first_frame        fixture -> StreamProxy -> VLC until playback starts
+                       (needs python-vlc; plays fixtures/sample.wav)
+
+Cases whose requirements are missing are reported as skipped. Results are
+written as JSON. With --baseline, every `*_ms` value that grew and every
+`*_per_s` value that shrank by more than the tolerance is listed as a
+regression and the exit status is 1.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import threading
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from standin import start_standin, FIXTURES_DIR
+
+from metrics import percentile
+
+QUALITIES = ("Auto", "1080p", "720p", "480p", "360p")
+BANDWIDTHS = (None, 100_000, 400_000, 2_000_000)  # bytes/s budgets for "Auto"
+
+
+def summarize(seconds, prefix):
+    values = sorted(seconds)
+    return {
+        f"{prefix}_p50_ms": percentile(values, 50) * 1000,
+        f"{prefix}_p95_ms": percentile(values, 95) * 1000,
+    }
+
+
+def load_info_dicts(base):
+    with open(os.path.join(FIXTURES_DIR, "info_dicts.json"), encoding="utf-8") as f:
+        text = f.read()
+    return json.loads(text.replace("{base}", base))
+
+
+def bench_search(base, repeat):
+    import search
+    from extractor import iter_video_renderers
+
+    search.SEARCH_URL = base + "/results?search_query={}"
+    search.CONTINUATION_URL = base + "/youtubei/v1/search"
+
+    fetch, parse, continuation = [], [], []
+    records = 0
+    for i in range(repeat):
+        timings = {}
+        start = time.perf_counter()
+        page = search.fetch_results(f"benchmark query {i}", timings=timings)
+        fetch.append(time.perf_counter() - start)
+        parse.append(timings['parse'])
+        records = len(page['records'])
+
+        start = time.perf_counter()
+        search.fetch_continuation(page['continuation'])
+        continuation.append(time.perf_counter() - start)
+
+    with open(os.path.join(FIXTURES_DIR, "search_results.html"), 'rb') as f:
+        html = f.read()
+    chunk = 64 * 1024
+    start = time.perf_counter()
+    for _ in range(repeat):
+        list(iter_video_renderers(html[i:i + chunk] for i in range(0, len(html), chunk)))
+    elapsed = time.perf_counter() - start
+
+    result = {'records': records, 'parse_mb_per_s': len(html) * repeat / elapsed / 1e6}
+    result.update(summarize(fetch, "fetch"))
+    result.update(summarize(parse, "parse"))
+    result.update(summarize(continuation, "continuation"))
+    return result
+
+
+def bench_format_selection(base, repeat):
+    from formats import FormatIndex
+
+    infos = load_info_dicts(base)
+    build, select = [], []
+    for _ in range(repeat):
+        for info in infos:
+            start = time.perf_counter()
+            index = FormatIndex(info)
+            build.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for quality in QUALITIES:
+                for bandwidth in BANDWIDTHS:
+                    index.choose(quality, bandwidth)
+            index.choose("Auto", audio_only=True)
+            select.append((time.perf_counter() - start) / (len(QUALITIES) * len(BANDWIDTHS) + 1))
+    result = {'videos': len(infos), 'choices_per_s': len(select) / sum(select)}
+    result.update({key.replace("_ms", "_us"): value * 1000 for key, value in summarize(build, "build").items()})
+    return result
+
+
+def bench_results_list(repeat):
+    try:
+        import customtkinter as ctk
+        window = ctk.CTk()
+    except Exception as e:
+        return {'skipped': f"no display or customtkinter: {e}"}
+    from bench_results_list import make_records, bench_virtual
+
+    render, scroll = [], []
+    try:
+        records = make_records(500)
+        for _ in range(repeat):
+            r, s = bench_virtual(window, records)
+            render.append(r)
+            scroll.append(s)
+    finally:
+        window.destroy()
+    result = {'rows': 500}
+    result.update(summarize(render, "render"))
+    result.update(summarize(scroll, "scroll"))
+    return result
+
+
+def bench_first_frame(base, repeat):
+    try:
+        import vlc
+        instance = vlc.Instance("--no-video", "--aout=dummy", "--quiet")
+        if instance is None:
+            raise RuntimeError("libvlc could not be initialised")
+    except Exception as e:
+        return {'skipped': f"python-vlc unavailable: {e}"}
+    from formats import FormatIndex
+    from proxy import StreamProxy
+
+    info = load_info_dicts(base)[0]
+    proxy = StreamProxy().start()
+    player = instance.media_player_new()
+    started = threading.Event()
+
+    def on_time(event):
+        if event.u.new_time > 0:
+            started.set()
+
+    player.event_manager().event_attach(vlc.EventType.MediaPlayerTimeChanged, on_time)
+    first_frame, timeouts = [], 0
+    try:
+        for attempt in range(repeat):
+            started.clear()
+            start = time.perf_counter()
+            url, _ = FormatIndex(info).choose("Auto", audio_only=True)
+            # A new query string per run, so the proxy starts cold every time
+            media = instance.media_new(proxy.register(f"{url}&run={attempt}"))
+            player.set_media(media)
+            player.play()
+            if started.wait(10):
+                first_frame.append(time.perf_counter() - start)
+            else:
+                timeouts += 1
+            player.stop()
+    finally:
+        player.release()
+        instance.release()
+        proxy.stop()
+    if not first_frame:
+        return {'skipped': "playback never started"}
+    result = {'timeouts': timeouts}
+    result.update(summarize(first_frame, "first_frame"))
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """Lines describing metrics that got worse than baseline by more than tolerance"""
+    regressions = []
+    for case, values in results.items():
+        old_values = baseline.get('results', {}).get(case, {})
+        for key, value in values.items():
+            old = old_values.get(key)
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or not old:
+                continue
+            change = (value - old) / old
+            if (key.endswith(("_ms", "_us")) and change > tolerance) or \
+                    (key.endswith("_per_s") and -change > tolerance):
+                regressions.append(f"{case}.{key}: {old:.3f} -> {value:.3f} ({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", help="write the JSON results here instead of stdout")
+    parser.add_argument("--baseline", help="earlier results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    server, base = start_standin()
+    results = {}
+    try:
+        for name, bench in (("search", lambda: bench_search(base, args.repeat)),
+                            ("format_selection", lambda: bench_format_selection(base, args.repeat)),
+                            ("results_list", lambda: bench_results_list(args.repeat)),
+                            ("first_frame", lambda: bench_first_frame(base, min(args.repeat, 5)))):
+            print(f"{name}...", file=sys.stderr)
+            results[name] = bench()
+    finally:
+        server.shutdown()
+
+    report = {
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"Regression: {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
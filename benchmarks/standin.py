@@ -0,0 +1,127 @@
+# benchmarks/standin.py
+"""Local HTTP stand-in for the YouTube endpoints the player talks to
+
+    GET  /results?search_query=...   fixtures/search_results.html
+    POST /youtubei/v1/search         fixtures/continuation.json
+    GET  /media/<file>               a fixture (or server.payload) with byte ranges
+    GET  /sample.bin                 server.payload with byte ranges
+
+Every response is written in 64 KB pieces at most `server.rate` bytes/s
+per connection (unlimited when rate is None), like a throttled CDN edge.
+Usage from a benchmark:
+
+    server, base = start_standin(rate=4 * 1024 * 1024)
+    search.SEARCH_URL = base + "/results?search_query={}"
+"""
+import os
+import re
+import time
+import threading
+from urllib.parse import urlparse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+RANGE_HEADER = re.compile(r'bytes=(\d+)-(\d*)')
+PIECE = 64 * 1024
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def handle(self):
+        try:
+            super().handle()
+        except ConnectionResetError:
+            pass  # client dropped a keep-alive connection
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/results":
+            self.send_body(self.server.fixture("search_results.html"), "text/html; charset=utf-8")
+        elif path == "/sample.bin":
+            self.send_ranged(self.server.payload)
+        elif path.startswith("/media/"):
+            self.send_ranged(self.server.fixture(os.path.basename(path)))
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if urlparse(self.path).path == "/youtubei/v1/search":
+            self.send_body(self.server.fixture("continuation.json"), "application/json")
+        else:
+            self.send_error(404)
+
+    def send_body(self, data, content_type):
+        if data is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.write_throttled(data)
+
+    def send_ranged(self, payload):
+        if payload is None:
+            self.send_error(404)
+            return
+        start, end = 0, len(payload) - 1
+        match = RANGE_HEADER.match(self.headers.get('Range', ''))
+        if match:
+            start = int(match.group(1))
+            end = min(int(match.group(2) or end), end)
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{end}/{len(payload)}")
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(end - start + 1))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.end_headers()
+        self.write_throttled(payload[start:end + 1])
+
+    def write_throttled(self, data):
+        rate = self.server.rate
+        try:
+            for offset in range(0, len(data), PIECE):
+                piece = data[offset:offset + PIECE]
+                self.wfile.write(piece)
+                if rate:
+                    time.sleep(len(piece) / rate)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, rate=None, payload=b""):
+        super().__init__(('127.0.0.1', 0), StandinHandler)
+        self.rate = rate
+        self.payload = payload
+        self._fixtures = {}
+
+    def fixture(self, name):
+        """Bytes of a fixture file, read once; None if it does not exist"""
+        if name not in self._fixtures:
+            path = os.path.join(FIXTURES_DIR, name)
+            if not os.path.isfile(path):
+                return None
+            with open(path, 'rb') as f:
+                self._fixtures[name] = f.read()
+        return self._fixtures[name]
+
+    @property
+    def base_url(self):
+        host, port = self.server_address
+        return f"http://{host}:{port}"
+
+
+def start_standin(rate=None, payload=b""):
+    """Start a stand-in server on a free port; returns (server, base URL)"""
+    server = StandinServer(rate, payload)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.base_url
@@ -0,0 +1,95 @@
+# cache.py
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+def normalize_query(query):
+    return " ".join(query.lower().split())
+
+
+class SearchCache:
+    """First result pages keyed by normalized query
+
+    A bounded in-memory LRU sits in front of an optional SQLite table, so
+    repeated queries are served without touching the network, also across
+    restarts. Entries older than `ttl` seconds are treated as misses.
+    """
+
+    def __init__(self, max_entries=100, ttl=6 * 60 * 60, db_path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'expired': 0}
+
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_pages ("
+                "query TEXT PRIMARY KEY, created REAL NOT NULL, page TEXT NOT NULL)")
+            self._db.execute(
+                "DELETE FROM search_pages WHERE created < ?", (time.time() - ttl,))
+            self._db.commit()
+
+    def get(self, query):
+        """Return the cached page for query, or None"""
+        key = normalize_query(query)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created, page = entry
+                if now - created < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.counters['memory_hits'] += 1
+                    return page
+                del self._entries[key]
+                self.counters['expired'] += 1
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT created, page FROM search_pages WHERE query = ?",
+                    (key,)).fetchone()
+                if row is not None and now - row[0] < self.ttl:
+                    page = json.loads(row[1])
+                    self._remember(key, row[0], page)
+                    self.counters['disk_hits'] += 1
+                    return page
+
+            self.counters['misses'] += 1
+            return None
+
+    def put(self, query, page):
+        key = normalize_query(query)
+        created = time.time()
+        with self._lock:
+            self._remember(key, created, page)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO search_pages (query, created, page) VALUES (?, ?, ?)",
+                    (key, created, json.dumps(page)))
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['entries'] = len(self._entries)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        return stats
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _remember(self, key, created, page):
+        self._entries[key] = (created, page)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
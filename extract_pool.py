@@ -0,0 +1,153 @@
+# extract_pool.py
+import queue
+import itertools
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future
+
+from resolver import WATCH_URL, YDL_OPTS, compact_info
+
+
+def extraction_worker(tasks, results):
+    """Worker process: one YoutubeDL kept warm for every extraction it runs"""
+    import yt_dlp
+
+    ydl = yt_dlp.YoutubeDL(YDL_OPTS)
+    ydl.get_info_extractor('Youtube')  # loads the extractor before the first job
+    for job_id, video_id in iter(tasks.get, None):
+        try:
+            info = ydl.extract_info(WATCH_URL.format(video_id), download=False)
+            results.put((job_id, compact_info(info), None))
+        except Exception as e:
+            results.put((job_id, None, str(e)))
+
+
+class ExtractionPool:
+    """yt-dlp extraction in a few persistent worker processes
+
+    Signature and n-parameter decoding is CPU-heavy and holds the GIL, so
+    it runs outside the GUI process. Each worker imports yt-dlp once and
+    keeps its YoutubeDL for all jobs; only the compact format table
+    (resolver.compact_info) travels back. Jobs wait in a local queue and
+    are handed to a worker only when one is idle, so a job that was not
+    started yet can still be cancelled through its Future. A job already
+    running finishes, but nobody waits for it.
+
+    Background jobs (prefetch, next-item preload) wait behind interactive
+    ones, and with more than one worker they never occupy the last idle
+    worker, so a click does not queue behind speculative extractions.
+    """
+
+    def __init__(self, workers=2):
+        self.workers = workers
+        self._context = multiprocessing.get_context("spawn")  # no fork of a process running Tk/VLC threads
+        self._lock = threading.Lock()
+        self._pending = deque()  # (Future, video_id) not handed to a worker yet
+        self._background = deque()  # the same for speculative jobs
+        self.reserved = 1 if workers > 1 else 0  # workers kept free for interactive jobs
+        self._running = {}  # job id -> Future
+        self._job_ids = itertools.count()
+        self._idle = 0
+        self._processes = []
+        self._tasks = None
+        self._results = None
+
+    def start(self):
+        """Spawn the workers; submit() does this too if it was not done yet"""
+        with self._lock:
+            if self._processes:
+                return
+            self._spawn_workers()
+        threading.Thread(target=self._read_results, name="extract-results", daemon=True).start()
+
+    def submit(self, video_id, background=False):
+        """Future resolving to the compact info dict of video_id"""
+        self.start()
+        future = Future()
+        with self._lock:
+            (self._background if background else self._pending).append((future, video_id))
+            self._dispatch()
+        return future
+
+    def shutdown(self):
+        with self._lock:
+            processes, self._processes = self._processes, []
+            for future, _ in list(self._pending) + list(self._background):
+                future.cancel()
+            self._pending.clear()
+            self._background.clear()
+        if not processes:
+            return
+        for _ in processes:
+            self._tasks.put(None)
+        self._results.put((None, None, None))
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()  # in the middle of an extraction
+
+    def _spawn_workers(self):
+        # Caller holds the lock. Fresh queues: a killed worker may have
+        # died holding the lock of the old ones
+        self._tasks = self._context.Queue()
+        self._results = self._context.Queue()
+        self._processes = []
+        for i in range(self.workers):
+            process = self._context.Process(
+                target=extraction_worker, args=(self._tasks, self._results),
+                name=f"extract-{i}", daemon=True)
+            process.start()
+            self._processes.append(process)
+        self._idle = self.workers
+
+    def _restart_if_crashed(self):
+        """Restart the workers after one died and fail the jobs that were running"""
+        with self._lock:
+            if all(process.is_alive() for process in self._processes):
+                return
+            for process in self._processes:
+                process.terminate()
+            self._spawn_workers()
+            lost = list(self._running.values())
+            self._running.clear()
+            self._dispatch()
+        for future in lost:
+            future.set_exception(Exception("Extraction worker exited"))
+
+    def _dispatch(self):
+        # Caller holds the lock
+        while self._idle:
+            if self._pending:
+                future, video_id = self._pending.popleft()
+            elif self._background and self._idle > self.reserved:
+                future, video_id = self._background.popleft()
+            else:
+                return
+            if not future.set_running_or_notify_cancel():
+                continue  # cancelled while waiting
+            job_id = next(self._job_ids)
+            self._running[job_id] = future
+            self._idle -= 1
+            self._tasks.put((job_id, video_id))
+
+    def _read_results(self):
+        while True:
+            try:
+                job_id, info, error = self._results.get(timeout=1)
+            except queue.Empty:
+                if self._processes:
+                    self._restart_if_crashed()
+                continue
+            if job_id is None:
+                return
+            with self._lock:
+                future = self._running.pop(job_id, None)
+                if future is None:
+                    continue  # already failed by _restart_if_crashed
+                self._idle += 1
+                self._dispatch()
+            if error is not None:
+                future.set_exception(Exception(error))
+            else:
+                future.set_result(info)
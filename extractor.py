@@ -0,0 +1,120 @@
+# extractor.py
+import re
+import json
+import codecs
+
+MARKER = b'var ytInitialData = '
+END = ';</script>'
+ITEM_SECTION = re.compile(r'"itemSectionRenderer":\s*\{\s*"contents":\s*\[')
+SEPARATORS = re.compile(r'[\s,]*')
+CONTINUATION_TOKEN = re.compile(
+    r'"continuationCommand":\s*\{\s*"token":\s*"([^"]+)"')
+
+
+class InitialDataExtractor:
+    """Incrementally locates ytInitialData in a results page
+
+    Feed raw response chunks with feed(); each call returns the videoRenderer
+    dicts that became complete with that chunk. Bytes before the
+    `var ytInitialData = ` marker are discarded as they arrive, and once the
+    closing `;</script>` is seen `done` is set and further input is ignored,
+    so the caller can stop reading the response.
+
+    Only direct items of itemSectionRenderer.contents count, as in
+    search.parse_continuation(); videos nested in shelves ("People also
+    watched" and the like) are skipped whole.
+    """
+
+    def __init__(self):
+        self.done = False
+        self._head = b''
+        self._decoder = None
+        self._json = json.JSONDecoder()
+        self._text = ''
+        self._end = -1
+        self._scan_pos = 0
+        self._in_section = False
+        self._seen = set()
+
+    def feed(self, chunk):
+        if self.done:
+            return []
+
+        if self._decoder is None:
+            data = self._head + chunk
+            index = data.find(MARKER)
+            if index == -1:
+                # Keep just enough tail to catch a marker split across chunks
+                self._head = data[-(len(MARKER) - 1):]
+                return []
+            self._head = b''
+            self._decoder = codecs.getincrementaldecoder('utf-8')('replace')
+            chunk = data[index + len(MARKER):]
+
+        search_from = max(0, len(self._text) - len(END))
+        self._text += self._decoder.decode(chunk)
+        end = self._text.find(END, search_from)
+        if end != -1:
+            self._text = self._text[:end]
+            self._end = end
+            self.done = True
+        return self._scan()
+
+    def close(self):
+        """Signal end of input; raises if the payload never completed"""
+        if not self.done:
+            raise ValueError("ytInitialData not found in page")
+
+    def continuation_token(self):
+        """Token for the next results page, if the payload carries one"""
+        self.close()
+        match = CONTINUATION_TOKEN.search(self._text)
+        return match.group(1) if match else None
+
+    def _scan(self):
+        items = []
+        text = self._text
+        while True:
+            if not self._in_section:
+                match = ITEM_SECTION.search(text, self._scan_pos)
+                if match is None:
+                    if self.done:
+                        self._scan_pos = len(text)
+                    else:
+                        # Leave room for a key that is only partially received
+                        self._scan_pos = max(self._scan_pos, len(text) - 64)
+                    return items
+                self._scan_pos = match.end()
+                self._in_section = True
+            pos = SEPARATORS.match(text, self._scan_pos).end()
+            if pos == len(text):
+                self._scan_pos = pos
+                return items
+            if text[pos] == ']':
+                self._scan_pos = pos + 1
+                self._in_section = False
+                continue
+            try:
+                item, end = self._json.raw_decode(text, pos)
+            except ValueError:
+                if self.done:
+                    raise
+                # Item continues in a chunk that has not arrived yet
+                self._scan_pos = pos
+                return items
+            self._scan_pos = end
+            video = item.get('videoRenderer') if isinstance(item, dict) else None
+            video_id = video.get('videoId') if video else None
+            if video_id and video_id not in self._seen:
+                self._seen.add(video_id)
+                items.append(video)
+
+
+def iter_video_renderers(chunks, extractor=None):
+    """Yield videoRenderer dicts from an iterable of byte chunks, stopping early"""
+    extractor = extractor or InitialDataExtractor()
+    for chunk in chunks:
+        yield from extractor.feed(chunk)
+        if extractor.done:
+            return
+    extractor.close()
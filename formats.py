@@ -0,0 +1,174 @@
+# formats.py
+
+
+def has_video(f):
+    return f.get('vcodec') not in (None, 'none') and bool(f.get('height'))
+
+
+def has_audio(f):
+    return f.get('acodec') not in (None, 'none')
+
+
+def bitrate(f):
+    """Total bitrate in kbit/s, 0 when yt-dlp does not know it"""
+    return f.get('tbr') or (f.get('vbr') or 0) + (f.get('abr') or 0)
+
+
+def filesize(f):
+    return f.get('filesize') or f.get('filesize_approx')
+
+
+def stream_rate(f, duration=None):
+    """Bytes per second needed to play f in real time, None if unknown"""
+    if bitrate(f):
+        return bitrate(f) * 1000 / 8
+    if filesize(f) and duration:
+        return filesize(f) / duration
+    return None
+
+
+def is_direct(f):
+    """Plain file over HTTP(S) that can be fetched with range requests"""
+    return f.get('protocol') in (None, 'http', 'https')
+
+
+def quality_height(quality):
+    """720 for "720p", None for "Auto" or anything unparsable"""
+    try:
+        return int(quality[:-1])
+    except (TypeError, ValueError):
+        return None
+
+
+def _rank(f):
+    return (f.get('fps') or 0, bitrate(f))
+
+
+class FormatIndex:
+    """Per-video lookup built once from an extracted format table
+
+    progressive: height -> best direct format carrying both audio and video
+    adaptive:    height -> best direct video-only format
+    audio:       best direct audio-only format
+    manifests:   height -> best HLS/DASH manifest format with audio
+    streams:     height -> (video, audio) actually played; audio is None
+                 for progressive formats, which win over an adaptive pair
+                 of the same height. Manifests are only used when the
+                 video has no direct format at all
+    """
+
+    def __init__(self, info):
+        self.info = info
+        self.progressive = {}
+        self.adaptive = {}
+        self.manifests = {}
+        self.audio = None
+        # Only direct URLs can go through the stream proxy or the media cache
+        self._direct_urls = {f['url']: is_direct(f) for f in info['formats'] if f.get('url')}
+
+        for f in info['formats']:
+            if has_video(f):
+                if not is_direct(f):
+                    if not has_audio(f):
+                        continue  # video-only manifests are not played with a separate track
+                    table = self.manifests
+                elif has_audio(f):
+                    table = self.progressive
+                else:
+                    table = self.adaptive
+                best = table.get(f['height'])
+                if best is None or _rank(f) > _rank(best):
+                    table[f['height']] = f
+            elif has_audio(f) and is_direct(f):
+                if self.audio is None or bitrate(f) > bitrate(self.audio):
+                    self.audio = f
+
+        self.streams = {}
+        if self.audio is not None:
+            for height, f in self.adaptive.items():
+                self.streams[height] = (f, self.audio)
+        for height, f in self.progressive.items():
+            self.streams[height] = (f, None)
+        if not self.streams:
+            for height, f in self.manifests.items():
+                self.streams[height] = (f, None)
+
+    def heights(self):
+        """Heights that can be played, highest first"""
+        return sorted(self.streams, reverse=True)
+
+    def qualities(self):
+        return ["Auto"] + [f"{height}p" for height in self.heights()]
+
+    def is_direct_url(self, url):
+        """True if url belongs to a direct (range-fetchable) format of this video"""
+        return self._direct_urls.get(url, False)
+
+    def rate(self, *formats):
+        """Bytes per second of formats played together, None if any is unknown"""
+        duration = self.info.get('duration')
+        rates = [stream_rate(f, duration) for f in formats if f is not None]
+        return None if None in rates or not rates else sum(rates)
+
+    def select(self, quality, bandwidth=None):
+        """(video, audio) at or below the requested quality, None if nothing is known
+
+        For "Auto" with a bandwidth estimate (bytes/s) this is the highest
+        stream whose bitrate fits into it; streams of unknown bitrate are
+        only used when nothing else fits.
+        """
+        heights = self.heights()
+        if not heights:
+            return None
+        target = quality_height(quality)
+        if target is None:
+            if bandwidth:
+                for height in heights:
+                    rate = self.rate(*self.streams[height])
+                    if rate is not None and rate <= bandwidth:
+                        return self.streams[height]
+                return self.streams[heights[-1]]
+            return self.streams[heights[0]]
+        for height in heights:
+            if height <= target:
+                return self.streams[height]
+        # Nothing that small: fall back to the lowest available
+        return self.streams[heights[-1]]
+
+    def playback_urls(self, quality, bandwidth=None):
+        """(video_url, audio_url); audio_url is None when the video carries its own sound"""
+        selected = self.select(quality, bandwidth)
+        if selected is None:
+            url = self.info.get('url')
+            if not url:
+                raise Exception("No playable URL found")
+            return url, None
+        video, audio = selected
+        return video['url'], audio['url'] if audio else None
+
+    def audio_playback_url(self):
+        """Best audio-only stream, falling back to the smallest progressive format"""
+        if self.audio is not None:
+            return self.audio['url']
+        if self.progressive:
+            return self.progressive[min(self.progressive)]['url']
+        return self.playback_urls("Auto")[0]
+
+    def choose(self, quality, bandwidth=None, audio_only=False):
+        """(video_url, audio_url) to play for the given quality and mode"""
+        if audio_only:
+            return self.audio_playback_url(), None
+        return self.playback_urls(quality, bandwidth)
+
+    @staticmethod
+    def describe(f):
+        """Short human readable summary, e.g. "720p avc1 1450 kbps 54.2 MB\""""
+        parts = [f"{f['height']}p" if f.get('height') else "audio"]
+        codec = f.get('vcodec') if has_video(f) else f.get('acodec')
+        if codec:
+            parts.append(codec.split('.')[0])
+        if bitrate(f):
+            parts.append(f"{bitrate(f):.0f} kbps")
+        if filesize(f):
+            parts.append(f"{filesize(f) / 1024 / 1024:.1f} MB")
+        return " ".join(parts)
@@ -29,7 +29,8 @@ class SearchFrame(ctk.CTkFrame):
 
 
 class ControlsFrame(ctk.CTkFrame):
-    def __init__(self, master, play_pause_callback, stop_callback, set_volume_callback, toggle_fullscreen_callback):
+    def __init__(self, master, play_pause_callback, stop_callback, set_volume_callback, toggle_fullscreen_callback,
+                 seek_callback=None, preview_callback=None):
         super().__init__(master)
         self.pack(pady=10, padx=10, fill="x")
 
@@ -38,6 +39,22 @@ class ControlsFrame(ctk.CTkFrame):
         self.progress_bar.pack(fill="x", padx=5, pady=5)
         self.progress_bar.set(0)
 
+        # Перемотка щелчком и перетаскиванием, кадр предпросмотра при наведении.
+        # seek_callback(fraction, final), preview_callback(fraction, x)
+        self.seek_callback = seek_callback
+        self.preview_callback = preview_callback
+        self.dragging = False
+        self.preview_shown = False
+        self.preview_image = None  # frame shown in the bubble
+        self.blank_preview = None  # 1x1 image that replaces it while hidden
+        self.preview = ctk.CTkLabel(master, text="", compound="top", corner_radius=6,
+                                    fg_color=("gray85", "gray20"))
+        self.progress_bar.bind("<Button-1>", self.on_bar_press)
+        self.progress_bar.bind("<B1-Motion>", self.on_bar_drag)
+        self.progress_bar.bind("<ButtonRelease-1>", self.on_bar_release)
+        self.progress_bar.bind("<Motion>", self.on_bar_hover)
+        self.progress_bar.bind("<Leave>", self.on_bar_leave)
+
         # Кнопки управления
         self.play_button = ctk.CTkButton(
             self,
@@ -94,5 +111,340 @@ class ControlsFrame(ctk.CTkFrame):
         self.current_time = ctk.CTkLabel(self, text="0:00")
         self.current_time.pack(side="left", padx=5)
 
+        # Потери кадров, паузы и скорость входного потока
+        self.health_label = ctk.CTkLabel(self, text="", text_color="gray")
+        self.health_label.pack(side="left", padx=5)
+
         self.total_time = ctk.CTkLabel(self, text="0:00")
-        self.total_time.pack(side="right", padx=5)
\ No newline at end of file
+        self.total_time.pack(side="right", padx=5)
+
+    def bar_fraction(self, event):
+        width = self.progress_bar.winfo_width()
+        return min(max(event.x / width, 0.0), 1.0) if width > 1 else 0.0
+
+    def on_bar_press(self, event):
+        self.dragging = True
+        self.on_bar_drag(event)
+
+    def on_bar_drag(self, event):
+        fraction = self.bar_fraction(event)
+        self.progress_bar.set(fraction)
+        self.on_bar_hover(event)
+        if self.seek_callback:
+            self.seek_callback(fraction, False)
+
+    def on_bar_release(self, event):
+        if not self.dragging:
+            return
+        self.dragging = False
+        self.hide_preview()
+        if self.seek_callback:
+            self.seek_callback(self.bar_fraction(event), True)
+
+    def on_bar_hover(self, event):
+        if self.preview_callback:
+            self.preview_callback(self.bar_fraction(event), min(max(event.x, 0), self.progress_bar.winfo_width()))
+
+    def on_bar_leave(self, event):
+        if not self.dragging:
+            self.hide_preview()
+
+    def show_preview(self, x, text):
+        """Show the preview bubble above the progress bar at bar position x"""
+        self.preview.configure(text=text)
+        bar = self.progress_bar
+        self.preview.place(x=bar.winfo_rootx() - self.master.winfo_rootx() + x,
+                           y=bar.winfo_rooty() - self.master.winfo_rooty() - 4, anchor="s")
+        self.preview.lift()
+        self.preview_shown = True
+
+    def set_preview_image(self, image):
+        # Frames can arrive after the pointer has left the bar
+        if self.preview_shown:
+            self.preview.configure(image=image)
+            self.preview_image = image
+
+    def hide_preview(self):
+        self.preview.place_forget()
+        if self.preview_image is not None:
+            # CTkLabel ignores image=None and would keep showing the old frame
+            if self.blank_preview is None:
+                from PIL import Image
+                self.blank_preview = ctk.CTkImage(Image.new('RGB', (1, 1)), size=(1, 1))
+            self.preview.configure(image=self.blank_preview)
+            self.preview_image = None
+        self.preview_shown = False
+
+
+class ResultsList(ctk.CTkFrame):
+    """Virtualized list of search results
+
+    Only a fixed pool of row buttons exists; scrolling rebinds them to other
+    records instead of creating widgets, so the cost of a list does not grow
+    with the number of results. on_near_end is called when the user scrolls
+    within `prefetch_rows` of the last loaded record; on_context(record, event)
+    on a right click.
+    """
+
+    ROW_HEIGHT = 50
+
+    def __init__(self, master, on_select, on_near_end=None, height=200, prefetch_rows=10,
+                 thumbnails=None, on_hover=None, on_context=None):
+        super().__init__(master, height=height)
+        self.pack(pady=10, padx=10, fill="x")
+        self.on_select = on_select
+        self.on_near_end = on_near_end
+        self.on_hover = on_hover
+        self.on_context = on_context
+        self.thumbnails = thumbnails
+        self.prefetch_rows = prefetch_rows
+        self.records = []
+        self.first = 0
+        self.visible_rows = max(1, height // self.ROW_HEIGHT)
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.rows_frame = ctk.CTkFrame(self, height=height, fg_color="transparent")
+        self.rows_frame.pack(side="left", fill="both", expand=True)
+
+        # Пул строк: на одну больше, чем помещается, чтобы не было пустого места
+        self.rows = []
+        for i in range(self.visible_rows + 1):
+            row = ctk.CTkButton(
+                self.rows_frame,
+                text="",
+                height=40,
+                anchor="w",
+                # Placeholder creates the image label now, so the wheel bindings below cover it
+                image=thumbnails.placeholder_image() if thumbnails else None,
+                compound="left",
+                fg_color=Settings.BUTTON_NORMAL_COLOR,
+                hover_color=Settings.BUTTON_HOVER_COLOR
+            )
+            row.bound_index = None
+            row.bind("<Enter>", lambda e, r=row: self.hovered(r))
+            # Правая кнопка мыши: Button-3 в Windows/Linux, Button-2 в macOS
+            row.bind("<Button-3>", lambda e, r=row: self.context(r, e))
+            row.bind("<Button-2>", lambda e, r=row: self.context(r, e))
+            self.rows.append(row)
+
+        self.message_label = ctk.CTkLabel(self.rows_frame, text="")
+
+        for widget in [self, self.rows_frame] + self.rows:
+            widget.bind("<MouseWheel>", self.on_mousewheel)
+            widget.bind("<Button-4>", lambda e: self.scroll_by(-1))
+            widget.bind("<Button-5>", lambda e: self.scroll_by(1))
+
+    def show_message(self, text, text_color=None):
+        """Replace the list with a single status line (e.g. "Searching...")"""
+        self.set_records([])
+        self.message_label.configure(text=text, text_color=text_color or ("gray10", "gray90"))
+        self.message_label.place(relx=0.5, y=10, anchor="n")
+
+    def set_records(self, records):
+        self.message_label.place_forget()
+        self.records = list(records)
+        self.first = 0
+        for row in self.rows:
+            if row.bound_index is not None:
+                row.bound_index = -1  # still placed, but showing a stale record
+        self.refresh()
+
+    def append_records(self, records):
+        self.records.extend(records)
+        self.refresh()
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.first + rows)
+
+    def scroll_to(self, first):
+        last_first = max(0, len(self.records) - self.visible_rows)
+        first = min(max(0, first), last_first)
+        if first != self.first:
+            self.first = first
+            self.refresh()
+
+    def on_mousewheel(self, event):
+        self.scroll_by(-1 if event.delta > 0 else 1)
+
+    def on_scrollbar(self, command, value, unit=None):
+        if command == "moveto":
+            self.scroll_to(round(float(value) * len(self.records)))
+        elif command == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self.scroll_by(int(value) * step)
+
+    def refresh(self):
+        """Bind pool rows to the records currently in view"""
+        if self.thumbnails:
+            # Published before any request: a fetch worker drops ids it does not see here
+            self.thumbnails.set_visible(
+                record['video_id'] for record in self.records[self.first:self.first + len(self.rows)])
+        for slot, row in enumerate(self.rows):
+            index = self.first + slot
+            if index >= len(self.records):
+                if row.bound_index is not None:
+                    row.place_forget()
+                    row.bound_index = None
+                continue
+            if row.bound_index != index:
+                record = self.records[index]
+                row.configure(
+                    text=self.row_text(record),
+                    command=lambda r=record: self.on_select(r)
+                )
+                if row.bound_index is None:
+                    row.place(relx=0.5, y=slot * self.ROW_HEIGHT + 5, relwidth=0.96, anchor="n")
+                row.bound_index = index
+                if self.thumbnails:
+                    self.bind_thumbnail(row, index, record['video_id'])
+
+        total = len(self.records)
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + self.visible_rows) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+        if (self.on_near_end and total
+                and self.first + self.visible_rows >= total - self.prefetch_rows):
+            self.on_near_end()
+
+    def hovered(self, row):
+        if self.on_hover and row.bound_index is not None and row.bound_index >= 0:
+            self.on_hover(self.records[row.bound_index])
+
+    def context(self, row, event):
+        if self.on_context and row.bound_index is not None and row.bound_index >= 0:
+            self.on_context(self.records[row.bound_index], event)
+
+    def bind_thumbnail(self, row, index, video_id):
+        image = self.thumbnails.get(video_id)
+        row.configure(image=image or self.thumbnails.placeholder_image())
+        if image is None:
+            def show(image):
+                # The row may have been recycled for another record meanwhile
+                if row.bound_index == index:
+                    row.configure(image=image)
+            self.thumbnails.request(video_id, show)
+
+    @staticmethod
+    def row_text(record):
+        title = f"🕘 {record['title']}" if record.get('played') else record['title']
+        if record.get('duration'):
+            return f"{title}  [{record['duration']}]"
+        return title
+
+
+class QueueWindow(ctk.CTkToplevel):
+    """Play queue editor: reorder, remove or start items"""
+
+    def __init__(self, master, play_queue, on_play):
+        super().__init__(master)
+        self.title("Queue")
+        self.geometry("500x400")
+        self.play_queue = play_queue
+        self.on_play = on_play
+
+        self.items_frame = ctk.CTkScrollableFrame(self)
+        self.items_frame.pack(pady=10, padx=10, fill="both", expand=True)
+
+        buttons_frame = ctk.CTkFrame(self)
+        buttons_frame.pack(pady=(0, 10), padx=10, fill="x")
+        ctk.CTkButton(
+            buttons_frame,
+            text="⏭️ Play next",
+            command=lambda: self.on_play(None),
+            fg_color=Settings.BUTTON_NORMAL_COLOR,
+            hover_color=Settings.BUTTON_HOVER_COLOR
+        ).pack(side="left", padx=5)
+        ctk.CTkButton(
+            buttons_frame,
+            text="🗑️ Clear",
+            command=self.clear,
+            fg_color=Settings.BUTTON_NORMAL_COLOR,
+            hover_color=Settings.BUTTON_HOVER_COLOR
+        ).pack(side="right", padx=5)
+
+        self.refresh()
+
+    def refresh(self):
+        # Очередь короткая, строки просто пересоздаются
+        for widget in self.items_frame.winfo_children():
+            widget.destroy()
+        if not self.play_queue.items:
+            ctk.CTkLabel(self.items_frame, text="Queue is empty").pack(pady=10)
+            return
+        for index, record in enumerate(self.play_queue.items):
+            row = ctk.CTkFrame(self.items_frame)
+            row.pack(fill="x", pady=2)
+            ctk.CTkLabel(row, text=ResultsList.row_text(record), anchor="w").pack(
+                side="left", padx=5, fill="x", expand=True)
+            for text, command in (("✕", lambda i=index: self.remove(i)),
+                                  ("▼", lambda i=index: self.move(i, 1)),
+                                  ("▲", lambda i=index: self.move(i, -1)),
+                                  ("▶", lambda i=index: self.on_play(i))):
+                ctk.CTkButton(
+                    row,
+                    text=text,
+                    width=30,
+                    command=command,
+                    fg_color=Settings.BUTTON_NORMAL_COLOR,
+                    hover_color=Settings.BUTTON_HOVER_COLOR
+                ).pack(side="right", padx=2)
+
+    def move(self, index, offset):
+        self.play_queue.move(index, offset)
+        self.refresh()
+
+    def remove(self, index):
+        self.play_queue.remove(index)
+        self.refresh()
+
+    def clear(self):
+        self.play_queue.clear()
+        self.refresh()
+
+
+class DiagnosticsWindow(ctk.CTkToplevel):
+    """Latency percentiles per span plus cache and network counters, refreshed every second"""
+
+    REFRESH_MS = 1000
+
+    def __init__(self, master, metrics, counters, on_toggle):
+        super().__init__(master)
+        self.title("Diagnostics")
+        self.geometry("560x420")
+        self.metrics = metrics
+        self.counters = counters
+
+        self.enabled_var = ctk.BooleanVar(value=metrics.enabled)
+        ctk.CTkSwitch(
+            self,
+            text="Collect timings",
+            variable=self.enabled_var,
+            command=lambda: on_toggle(self.enabled_var.get())
+        ).pack(pady=10, padx=10, anchor="w")
+
+        self.text = ctk.CTkTextbox(self, font=("Courier", 12), wrap="none")
+        self.text.pack(pady=(0, 10), padx=10, fill="both", expand=True)
+
+        self.refresh()
+
+    def refresh(self):
+        if not self.winfo_exists():
+            return
+        lines = [f"{'span':<24} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}"]
+        for name, stats in sorted(self.metrics.summary().items()):
+            lines.append(f"{name:<24} {stats['count']:>6} {stats['p50']:>9.1f} "
+                         f"{stats['p95']:>9.1f} {stats['max']:>9.1f}")
+        if len(lines) == 1:
+            lines.append("No timings yet" if self.metrics.enabled else "Timing collection is off")
+        lines.append("")
+        lines.extend(self.counters())
+
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.insert("1.0", "\n".join(lines))
+        self.text.configure(state="disabled")
+        self.after(self.REFRESH_MS, self.refresh)
@@ -0,0 +1,96 @@
+# health.py
+from collections import deque
+
+# Cumulative counters of vlc.MediaStats that the monitor looks at
+STATS_FIELDS = (
+    'read_bytes', 'demux_read_bytes', 'decoded_video', 'displayed_pictures',
+    'lost_pictures', 'played_abuffers', 'lost_abuffers', 'demux_corrupted',
+)
+
+
+def media_stats(media, stats):
+    """Counters of `media` as a dict, filled through a reusable vlc.MediaStats; None if unavailable"""
+    if media is None or not media.get_stats(stats):
+        return None
+    return {name: getattr(stats, name) for name in STATS_FIELDS}
+
+
+class PlaybackHealth:
+    """Frame drop and stall rates from periodic VLC media statistics
+
+    sample() takes the cumulative counters of media.get_stats() plus the
+    seconds spent rebuffering so far, and turns them into per-interval
+    deltas; rates cover the last `window` intervals. An interval is bad
+    when more than `drop_limit` of its frames were lost or more than
+    `stall_limit` of it was spent buffering. After `sustain` bad
+    intervals in a row verdict() says "down", after `recover` good ones
+    "up"; either answer starts both streaks over, so a switched stream
+    gets a fair chance before the next step.
+    """
+
+    def __init__(self, window=5, drop_limit=0.05, stall_limit=0.1, sustain=3, recover=15):
+        self.drop_limit = drop_limit
+        self.stall_limit = stall_limit
+        self.sustain = sustain
+        self.recover = recover
+        self._intervals = deque(maxlen=window)
+        self._last = None  # (time, counters) of the previous sample
+        self._bad = 0
+        self._good = 0
+
+    def reset(self):
+        """Forget the baseline, e.g. while paused; streaks are kept"""
+        self._last = None
+
+    def sample(self, now, counters, stalled_seconds):
+        counters = dict(counters, stalled_seconds=stalled_seconds)
+        last, self._last = self._last, (now, counters)
+        if last is None:
+            return
+        last_time, last_counters = last
+        delta = {name: value - last_counters.get(name, 0) for name, value in counters.items()}
+        if now <= last_time or any(value < 0 for value in delta.values()):
+            return  # new media: VLC counters started over
+        delta['seconds'] = now - last_time
+        self._intervals.append(delta)
+
+        drop_rate, stall_rate = self._rates([delta])[:2]
+        if drop_rate > self.drop_limit or stall_rate > self.stall_limit:
+            self._bad += 1
+            self._good = 0
+        else:
+            self._good += 1
+            self._bad = 0
+
+    def rates(self):
+        """{'drop_rate', 'stall_rate', 'audio_loss', 'kbps'} over the window, None before two samples"""
+        if not self._intervals:
+            return None
+        drop_rate, stall_rate, audio_loss, kbps = self._rates(self._intervals)
+        return {'drop_rate': drop_rate, 'stall_rate': stall_rate, 'audio_loss': audio_loss, 'kbps': kbps}
+
+    def verdict(self):
+        """"down", "up" or None"""
+        if self._bad >= self.sustain:
+            advice = "down"
+        elif self._good >= self.recover:
+            advice = "up"
+        else:
+            return None
+        self._bad = self._good = 0
+        return advice
+
+    @staticmethod
+    def _rates(intervals):
+        total = {}
+        for interval in intervals:
+            for name, value in interval.items():
+                total[name] = total.get(name, 0) + value
+        frames = total['displayed_pictures'] + total['lost_pictures']
+        buffers = total['played_abuffers'] + total['lost_abuffers']
+        return (
+            total['lost_pictures'] / frames if frames else 0.0,
+            min(total['stalled_seconds'] / total['seconds'], 1.0),
+            total['lost_abuffers'] / buffers if buffers else 0.0,
+            total['read_bytes'] * 8 / 1000 / total['seconds'],
+        )
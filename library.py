@@ -0,0 +1,189 @@
+# library.py
+import re
+import time
+import queue
+import sqlite3
+import threading
+
+FLUSH_INTERVAL = 1.0  # Секунд между пакетными записями
+BATCH_SIZE = 500
+TOKEN = re.compile(r'\w+', re.UNICODE)
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS videos ("
+    "video_id TEXT PRIMARY KEY, title TEXT NOT NULL, channel TEXT NOT NULL DEFAULT '', "
+    "duration TEXT NOT NULL DEFAULT '', position REAL NOT NULL DEFAULT 0, "
+    "length REAL NOT NULL DEFAULT 0, seen REAL NOT NULL, played REAL)",
+]
+FTS_SCHEMA = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS videos_fts USING fts5("
+    "title, channel, content='videos', content_rowid='rowid', tokenize='unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS videos_ai AFTER INSERT ON videos BEGIN "
+    "INSERT INTO videos_fts (rowid, title, channel) VALUES (new.rowid, new.title, new.channel); END",
+    "CREATE TRIGGER IF NOT EXISTS videos_ad AFTER DELETE ON videos BEGIN "
+    "INSERT INTO videos_fts (videos_fts, rowid, title, channel) "
+    "VALUES ('delete', old.rowid, old.title, old.channel); END",
+    "CREATE TRIGGER IF NOT EXISTS videos_au AFTER UPDATE OF title, channel ON videos BEGIN "
+    "INSERT INTO videos_fts (videos_fts, rowid, title, channel) "
+    "VALUES ('delete', old.rowid, old.title, old.channel); "
+    "INSERT INTO videos_fts (rowid, title, channel) VALUES (new.rowid, new.title, new.channel); END",
+]
+
+UPSERT_SEEN = (
+    "INSERT INTO videos (video_id, title, channel, duration, seen) VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT (video_id) DO UPDATE SET title = excluded.title, channel = excluded.channel, "
+    "duration = excluded.duration, seen = excluded.seen")
+UPSERT_PLAYED = (
+    "INSERT INTO videos (video_id, title, seen, played) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (video_id) DO UPDATE SET played = excluded.played")
+UPDATE_POSITION = "UPDATE videos SET position = ?, length = ? WHERE video_id = ?"
+
+
+def match_query(text):
+    """FTS5 query matching every word of text as a prefix, or None"""
+    tokens = TOKEN.findall(text.lower())
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+class VideoLibrary:
+    """Every video seen in results or played, searchable offline
+
+    Rows live in SQLite with an FTS5 index over title and channel, so
+    search-as-you-type answers from disk in well under a millisecond.
+    Writes go through a queue to one writer thread that commits them in
+    batches, never on the Tk thread; after each batch the oldest unplayed
+    rows (then the oldest played ones) are pruned down to `max_videos`.
+    Without FTS5 in the sqlite build, search falls back to LIKE.
+    """
+
+    def __init__(self, db_path, max_videos=5000, flush_interval=FLUSH_INTERVAL):
+        self.max_videos = max_videos
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._writes = queue.Queue()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self.fts = True
+        try:
+            for statement in SCHEMA:
+                self._db.execute(statement)
+            try:
+                for statement in FTS_SCHEMA:
+                    self._db.execute(statement)
+            except sqlite3.OperationalError as e:
+                print(f"Library search without FTS5: {str(e)}")
+                self.fts = False
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Error opening library: {str(e)}")
+            self._db.close()
+            self._db = sqlite3.connect(":memory:", check_same_thread=False)
+            for statement in SCHEMA:
+                self._db.execute(statement)
+            self.fts = False
+        self._writer = threading.Thread(target=self._write_loop, name="library-writer", daemon=True)
+        self._writer.start()
+
+    def add_records(self, records):
+        """Remember result records (video_id, title, channel, duration)"""
+        now = time.time()
+        for record in records:
+            self._writes.put((UPSERT_SEEN, (
+                record['video_id'], record['title'], record.get('channel', ''),
+                record.get('duration', ''), now)))
+
+    def played(self, video_id, title):
+        now = time.time()
+        self._writes.put((UPSERT_PLAYED, (video_id, title, now, now)))
+
+    def set_position(self, video_id, position, length):
+        """Last playback position and length of video_id, in seconds"""
+        self._writes.put((UPDATE_POSITION, (position, length, video_id)))
+
+    def position(self, video_id):
+        """(position, length) in seconds saved for video_id, or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT position, length FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+        return tuple(row) if row else None
+
+    def search(self, text, limit=10):
+        """Records matching every word of text as a prefix, played videos first"""
+        if self.fts:
+            match = match_query(text)
+            if match is None:
+                return []
+            sql = ("SELECT v.video_id, v.title, v.channel, v.duration, v.played FROM videos_fts "
+                   "JOIN videos v ON v.rowid = videos_fts.rowid WHERE videos_fts MATCH ? "
+                   "ORDER BY v.played IS NULL, rank LIMIT ?")
+            args = [match, limit]
+        else:
+            words = TOKEN.findall(text.lower())
+            if not words:
+                return []
+            sql = ("SELECT video_id, title, channel, duration, played FROM videos WHERE "
+                   + " AND ".join(["(title || ' ' || channel) LIKE ?"] * len(words))
+                   + " ORDER BY played IS NULL, seen DESC LIMIT ?")
+            args = [f"%{word}%" for word in words] + [limit]
+        try:
+            with self._lock:
+                rows = self._db.execute(sql, args).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error searching library: {str(e)}")
+            return []
+        return [
+            {'video_id': video_id, 'title': title, 'channel': channel, 'duration': duration,
+             'local': True, 'played': played is not None}
+            for video_id, title, channel, duration, played in rows
+        ]
+
+    def stats(self):
+        with self._lock:
+            videos, played = self._db.execute(
+                "SELECT COUNT(*), COUNT(played) FROM videos").fetchone()
+        return {'videos': videos, 'played': played, 'pending_writes': self._writes.qsize()}
+
+    def close(self):
+        """Write what is still queued and close the database"""
+        self._writes.put(None)
+        self._writer.join(timeout=5)
+        with self._lock:
+            self._db.close()
+
+    def _write_loop(self):
+        item = self._writes.get()
+        while item is not None:
+            # Collect whatever arrives within flush_interval into one transaction
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < BATCH_SIZE:
+                try:
+                    item = self._writes.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    break
+                batch.append(item)
+            self._flush(batch)
+            if item is None:
+                return
+            item = self._writes.get()
+
+    def _flush(self, batch):
+        try:
+            with self._lock:
+                with self._db:
+                    for sql, args in batch:
+                        self._db.execute(sql, args)
+                    self._prune()
+        except sqlite3.Error as e:
+            print(f"Error writing library: {str(e)}")
+
+    def _prune(self):
+        # Caller holds the lock inside a transaction
+        (count,) = self._db.execute("SELECT COUNT(*) FROM videos").fetchone()
+        if count > self.max_videos:
+            self._db.execute(
+                "DELETE FROM videos WHERE rowid IN (SELECT rowid FROM videos "
+                "ORDER BY played IS NOT NULL, COALESCE(played, seen) LIMIT ?)", (count - self.max_videos,))
@@ -1,20 +1,17 @@
-import os
 import sys
 import time
-from player import YouTubePlayer
 from utils import install_requirements, check_vlc
-from gui import SearchFrame, ControlsFrame
 
 def main():
-    # Check and install dependencies
-    if not os.path.exists("installed.flag"):
-        install_requirements()
-        with open("installed.flag", "w") as f:
-            f.write("Dependencies installed")
-    
+    # Check and install dependencies (metadata lookup only, pip runs just for missing ones)
+    install_requirements()
+
     # Check VLC
     check_vlc()
-    
+
+    # Imported here so that missing packages can be installed first
+    from player import YouTubePlayer
+
     # Run application
     app = YouTubePlayer()
     app.run()
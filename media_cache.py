@@ -0,0 +1,137 @@
+# media_cache.py
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+WATCH_URL = "https://www.youtube.com/watch?v={}"
+INDEX_FILE = "index.json"
+DIRECT_BEST = "best[protocol=https]/best[protocol=http]"
+
+
+class MediaCache:
+    """Opt-in local copies of watched videos
+
+    Downloads run one at a time on a background thread through yt-dlp,
+    which keeps partial data in `.part` files and resumes them
+    (`continuedl`) when the same video is queued again, also after a
+    restart. Completed files are recorded in index.json with their size
+    and last use, and the least recently used ones are deleted once the
+    total exceeds `budget_bytes`. Lookups only update last use in memory;
+    the index is written when a download completes and on shutdown.
+    """
+
+    def __init__(self, directory, budget_bytes, progress_hook=None):
+        self.directory = directory
+        self.budget_bytes = budget_bytes
+        self.progress_hook = progress_hook
+        os.makedirs(directory, exist_ok=True)
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="media-cache")
+        self._lock = threading.Lock()
+        self._queued = set()
+        self._index_path = os.path.join(directory, INDEX_FILE)
+        self._index = self._load_index()
+        self._dirty = False  # In-memory index has changes not yet in index.json
+
+    def path_for(self, video_id):
+        """Local file for video_id if it is fully downloaded, else None"""
+        with self._lock:
+            entry = self._index.get(video_id)
+            if entry is None:
+                return None
+            path = os.path.join(self.directory, entry['file'])
+            if not os.path.exists(path):
+                del self._index[video_id]
+                self._dirty = True
+                return None
+            entry['last_used'] = time.time()
+            self._dirty = True
+            return path
+
+    def enqueue(self, video_id, format_id=None):
+        """Download video_id in the background unless it is cached or queued"""
+        with self._lock:
+            if video_id in self._index or video_id in self._queued:
+                return
+            self._queued.add(video_id)
+        self._executor.submit(self._download, video_id, format_id)
+
+    def usage(self):
+        with self._lock:
+            return sum(entry['size'] for entry in self._index.values())
+
+    def shutdown(self):
+        # A download in progress is abandoned; its .part file resumes next time
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    def _download(self, video_id, format_id):
+        import yt_dlp
+
+        ydl_opts = {
+            # Single-file formats over plain HTTP(S) only, so playback needs
+            # no muxing and the file is never an HLS/DASH download
+            'format': f"{format_id}/{DIRECT_BEST}" if format_id else DIRECT_BEST,
+            'outtmpl': os.path.join(self.directory, '%(id)s.%(ext)s'),
+            'continuedl': True,
+            'quiet': True,
+            'no_warnings': True,
+            'noprogress': True,
+        }
+        if self.progress_hook:
+            ydl_opts['progress_hooks'] = [self.progress_hook]
+
+        try:
+            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                info = ydl.extract_info(WATCH_URL.format(video_id), download=True)
+                path = ydl.prepare_filename(info)
+        except Exception as e:
+            print(f"Error caching video {video_id}: {str(e)}")
+            return
+        finally:
+            with self._lock:
+                self._queued.discard(video_id)
+
+        with self._lock:
+            self._index[video_id] = {
+                'file': os.path.basename(path),
+                'size': os.path.getsize(path),
+                'last_used': time.time(),
+            }
+            self._evict()
+            self._save_index()
+
+    def _evict(self):
+        total = sum(entry['size'] for entry in self._index.values())
+        for video_id, entry in sorted(self._index.items(), key=lambda item: item[1]['last_used']):
+            if total <= self.budget_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, entry['file']))
+            except OSError:
+                pass
+            total -= entry['size']
+            del self._index[video_id]
+
+    def _load_index(self):
+        if not os.path.exists(self._index_path):
+            return {}
+        try:
+            with open(self._index_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        try:
+            with open(self._index_path + ".tmp", 'w') as f:
+                json.dump(self._index, f)
+            os.replace(self._index_path + ".tmp", self._index_path)
+        except OSError as e:
+            print(f"Error saving media cache index: {str(e)}")
+            return
+        self._dirty = False
@@ -0,0 +1,124 @@
+# metrics.py
+import json
+import math
+import time
+import threading
+from collections import deque
+
+
+class _Span:
+    def __init__(self, metrics, name, attrs):
+        self.metrics = metrics
+        self.name = name
+        self.attrs = attrs
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        self.metrics.record(self.name, time.perf_counter() - self.start, **self.attrs)
+        return False
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Metrics:
+    """Named latency spans with percentiles and an optional JSONL trace
+
+    While disabled, span() hands out one shared no-op context manager and
+    record()/event() return at once, so instrumented code costs a method
+    call and an attribute check. Each span name keeps its last
+    `max_samples` durations for p50/p95; every span and event is also
+    appended to `trace_path` as one JSON object per line.
+    """
+
+    def __init__(self, enabled=False, trace_path=None, max_samples=500):
+        self.enabled = enabled
+        self.trace_path = trace_path
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._samples = {}  # name -> deque of seconds
+        self._trace = None
+
+    def span(self, name, **attrs):
+        """Context manager timing its block as `name`"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, attrs)
+
+    def record(self, name, seconds, **attrs):
+        """Add a duration measured elsewhere (e.g. across VLC events)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.max_samples)
+            samples.append(seconds)
+        self._write(dict(attrs, name=name, ms=round(seconds * 1000, 3)))
+
+    def event(self, name, **attrs):
+        """Trace-only entry without a duration, e.g. an error"""
+        if not self.enabled:
+            return
+        self._write(dict(attrs, name=name))
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        if not enabled:
+            self.close()
+
+    def summary(self):
+        """{name: {'count', 'p50', 'p95', 'max'}} with times in ms"""
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._samples.items()}
+        return {
+            name: {
+                'count': len(values),
+                'p50': percentile(values, 50) * 1000,
+                'p95': percentile(values, 95) * 1000,
+                'max': values[-1] * 1000,
+            }
+            for name, values in samples.items() if values
+        }
+
+    def close(self):
+        with self._lock:
+            if self._trace is not None:
+                self._trace.close()
+                self._trace = None
+
+    def _write(self, entry):
+        if not self.trace_path:
+            return
+        entry['ts'] = round(time.time(), 3)
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            try:
+                if self._trace is None:
+                    self._trace = open(self.trace_path, 'a', encoding='utf-8', buffering=1)
+                self._trace.write(line + "\n")
+            except OSError as e:
+                print(f"Error writing trace: {str(e)}")
+                self.trace_path = None
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = min(len(sorted_values), max(1, math.ceil(p / 100 * len(sorted_values)))) - 1
+    return sorted_values[rank]
@@ -0,0 +1,122 @@
+# net.py
+import time
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    # gzip/deflate, plus br/zstd when their decoders are installed
+    'Accept-Encoding': ACCEPT_ENCODING,
+}
+POOL_SIZE = 16  # proxy read-ahead, thumbnails, search and probes share one pool per host
+RETRIES = Retry(
+    total=3,
+    connect=3,
+    read=1,
+    backoff_factor=0.3,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(['GET', 'HEAD', 'POST']),
+    respect_retry_after_header=True,
+)
+
+
+class ConnectionStats:
+    """Requests sent vs. connections opened, and time spent connecting (TCP + TLS)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.connect_seconds = 0.0
+
+    def request_sent(self):
+        with self._lock:
+            self.requests += 1
+
+    def connected(self, seconds):
+        with self._lock:
+            self.connections += 1
+            self.connect_seconds += seconds
+
+    def snapshot(self):
+        with self._lock:
+            requests_sent, connections, seconds = self.requests, self.connections, self.connect_seconds
+        return {
+            'requests': requests_sent,
+            'connections': connections,
+            'reuse_rate': 1 - connections / requests_sent if requests_sent else 0.0,
+            'handshake_ms': seconds * 1000,
+            'handshake_ms_avg': seconds * 1000 / connections if connections else 0.0,
+        }
+
+
+STATS = ConnectionStats()
+
+
+class TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        STATS.connected(time.perf_counter() - start)
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        STATS.connected(time.perf_counter() - start)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class CountingAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools time every new connection"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        STATS.request_sent()
+        return super().send(request, **kwargs)
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def new_session(pool_size=POOL_SIZE, retries=RETRIES):
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = CountingAdapter(pool_connections=8, pool_maxsize=pool_size, max_retries=retries)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def session():
+    """Keep-alive session shared by search, thumbnails, probes and the stream proxy"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = new_session()
+        return _session
+
+
+def stats():
+    return STATS.snapshot()
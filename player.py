@@ -3,16 +3,41 @@ import sys
 import os
 import time
 import json
+import queue
 import threading
-import requests
-from bs4 import BeautifulSoup
+from concurrent.futures import CancelledError
+from tkinter import messagebox, Menu
 import customtkinter as ctk
-import vlc
-import yt_dlp
 
 from settings import Settings
-from gui import SearchFrame, ControlsFrame
+from gui import SearchFrame, ControlsFrame, ResultsList, QueueWindow, DiagnosticsWindow
 from utils import format_time
+from search import SearchExecutor
+from cache import SearchCache
+from library import VideoLibrary
+from resolver import StreamCache, resolve
+from formats import FormatIndex
+from extract_pool import ExtractionPool
+from thumbnails import ThumbnailLoader
+from storyboard import StoryboardPreviews
+from prefetch import StreamPrefetcher
+from media_cache import MediaCache
+from proxy import StreamProxy
+from bandwidth import ThroughputEstimator
+import net
+from metrics import Metrics
+from playqueue import PlayQueue
+from health import PlaybackHealth, media_stats
+from profiles import PROFILES, DEFAULT_PROFILE, ProfileStats, instance_options, media_options
+
+VLC_POLL_MS = 50  # Разбор событий VLC и перерисовка прогресса во время воспроизведения
+STARTUP_DEFER_MS = 50
+PRELOAD_BEFORE_END_MS = 30000
+SUGGEST_DELAY_MS = 150
+HEALTH_INTERVAL_MS = 2000  # Опрос статистики VLC
+SEEK_DEBOUNCE_MS = 150  # Перетаскивание по полосе даёт один set_time после паузы
+RESUME_MIN_SECONDS = 10  # Раньше этой позиции видео начинается сначала
+RESUME_END_SECONDS = 30  # Ближе этого к концу видео тоже начинается сначала
 
 class YouTubePlayer:
     def __init__(self):
@@ -21,37 +46,113 @@ class YouTubePlayer:
         self.window.geometry(Settings.WINDOW_SIZE)
         ctk.set_appearance_mode(Settings.THEME)
 
-        # Initialize VLC with error handling
-        try:
-            self.instance = vlc.Instance()
-            if not self.instance:
-                raise Exception("Failed to create VLC instance")
-            
-            self.player = self.instance.media_player_new()
-            if not self.player:
-                raise Exception("Failed to create media player")
-        except Exception as e:
-            print(f"Error initializing VLC: {e}")
-            messagebox.showerror("Error", "Failed to initialize VLC player. Please check VLC installation.")
-            sys.exit(1)
-            
+        # VLC создаётся после первой отрисовки окна (см. finish_startup)
+        self.instance = None
+        self.player = None
+        self.media = None  # vlc.Media, переданный плееру; по нему снимается статистика
+
         self.is_playing = False
         self.current_url = None
 
+        # Замеры задержек (включаются в окне диагностики), трасса в JSONL
+        self.metrics = Metrics(Settings.METRICS_ENABLED, Settings.TRACE_FILE)
+        self.diagnostics_window = None
+        self.load_started = None
+        self.media_started = None
+
+        # Кэш извлечённых форматов; при ошибке VLC (истёкшая ссылка) запись обновляется
+        self.stream_cache = StreamCache(Settings.STREAM_CACHE_SIZE)
+        # yt-dlp работает в отдельных процессах (запускаются в finish_startup)
+        self.extraction_pool = ExtractionPool(Settings.EXTRACTION_WORKERS)
+        self.load_generation = 0
+        self.pending_extraction = None
+        # Первые результаты и строка под курсором разрешаются заранее
+        self.prefetcher = StreamPrefetcher(
+            self.stream_cache, Settings.PREFETCH_WORKERS, Settings.PREFETCH_COUNT,
+            self.extraction_pool)
+        # Локальный прокси с параллельной упреждающей загрузкой потока
+        self.proxy = None
+        if Settings.STREAM_PROXY:
+            self.proxy = StreamProxy(
+                read_ahead=Settings.PROXY_READ_AHEAD,
+                memory_bytes=Settings.PROXY_MEMORY_BUDGET
+            ).start()
+
+        # Локальный кэш видео (включается в настройках)
+        self.media_cache = MediaCache(
+            Settings.MEDIA_CACHE_DIR, Settings.MEDIA_CACHE_BUDGET, self.download_progress_hook)
+        # Оценка пропускной способности для качества "Auto"
+        self.bandwidth = ThroughputEstimator()
+        self.stall_count = 0
+        self.has_played = False
+        self.buffering = False
+        # Потери кадров и паузы на буферизацию; при устойчивых проблемах качество снижается
+        self.health = PlaybackHealth(
+            drop_limit=Settings.HEALTH_DROP_LIMIT, stall_limit=Settings.HEALTH_STALL_LIMIT)
+        self.health_stats = None  # vlc.MediaStats, reused for every sample
+        self.stall_seconds = 0.0
+        self.stall_started = None
+        self.health_cap = None  # highest height allowed while playback struggles
+        self.health_restore = None  # height to return to once it recovers
+        self.refreshed_video_id = None
+        self.current_index = None
+        self.quality_switch_started = None
+        # Только звук: VLC не декодирует видео; загрузка CPU сравнивается по режимам
+        self.current_audio_only = False
+        self.cpu_sample = None
+        self.cpu_usage = {True: [0.0, 0.0], False: [0.0, 0.0]}  # audio_only -> [cpu s, wall s]
+        self.audio_savings = None  # (audio kbps, video kbps) of the last audio-only video
+        # Время до первого кадра и число остановок по профилям воспроизведения
+        self.profile_stats = ProfileStats(Settings.PROFILE_STATS_FILE)
+        self.first_frame_started = None
+        # Очередь воспроизведения; следующий элемент готовится до конца текущего
+        self.play_queue = PlayQueue(Settings.QUEUE_FILE)
+        self.queue_window = None
+        self.preloaded_for = None
+
         self.current_video_id = None
         self.current_title = None
         self.current_url = None
+        self.current_audio_url = None
         self.is_video_fullscreen = False  # Флаг для отслеживания полноэкранного режима видео
 
+        # Поиск выполняется в фоновом потоке, повторные запросы берутся из кэша
+        self.search_cache = SearchCache(
+            Settings.SEARCH_CACHE_SIZE,
+            Settings.SEARCH_CACHE_TTL,
+            Settings.CACHE_DB if Settings.SEARCH_CACHE_PERSIST else None
+        )
+        self.search_executor = SearchExecutor(self.window, self.search_cache)
+
+        # Просмотренные и найденные видео, поиск по ним без сети
+        self.library = VideoLibrary(Settings.LIBRARY_DB, Settings.LIBRARY_SIZE)
+        self.suggest_job = None
+
         # Создание компонентов GUI
         self.search_frame = SearchFrame(self.window, self.search_videos)
+        self.search_frame.search_entry.bind("<KeyRelease>", self.on_search_typed)
 
         # Меню
         self.create_menu()
 
         # Фрейм с результатами поиска
-        self.results_frame = ctk.CTkScrollableFrame(self.window, height=200)
-        self.results_frame.pack(pady=10, padx=10, fill="x")
+        # Миниатюры грузятся только для видимых строк
+        self.thumbnails = ThumbnailLoader(
+            self.window,
+            Settings.THUMBNAIL_CACHE_DIR,
+            budget_bytes=Settings.THUMBNAIL_MEMORY_BUDGET
+        )
+        self.results_list = ResultsList(
+            self.window,
+            self.play_record,
+            self.load_more_results,
+            height=200,
+            thumbnails=self.thumbnails,
+            on_hover=lambda record: self.prefetcher.hover(record['video_id']),
+            on_context=self.show_result_menu
+        )
+        self.continuation = None
+        self.loading_more = False
 
         # Фрейм для видео
         self.video_frame = ctk.CTkFrame(self.window)
@@ -67,16 +168,94 @@ class YouTubePlayer:
             self.play_pause,
             self.stop,
             self.set_volume,
-            self.toggle_fullscreen  # Передаём метод toggle_fullscreen
+            self.toggle_fullscreen,  # Передаём метод toggle_fullscreen
+            seek_callback=self.seek,
+            preview_callback=self.preview_seek
         )
+        # Кадры предпросмотра при перемотке берутся из storyboard видео
+        self.storyboards = StoryboardPreviews(self.window, Settings.STORYBOARD_MEMORY_BUDGET)
+        self.seek_target = None
+        self.seek_job = None
 
         # Загрузка настроек
         self.load_settings()
+        self.quality_var.set(Settings.DEFAULT_QUALITY)
+        self.audio_only_var.set(Settings.AUDIO_ONLY)
+        self.metrics.set_enabled(Settings.METRICS_ENABLED)
+        self.refresh_queue()
+
+        # Обработчики событий VLC только сохраняют значения и ставят работу в очередь,
+        # её разбирает цикл в потоке Tk, пока идёт воспроизведение
+        self.vlc_events = queue.Queue()
+        self.vlc_polling = False
+        self.progress_time = 0
+        self.progress_length = 0
+        self.shown_progress = (None, None, None)
+
+        # Тяжёлая инициализация откладывается, чтобы окно появилось сразу
+        self.window.after(STARTUP_DEFER_MS, self.finish_startup)
+
+    def finish_startup(self):
+        self.init_vlc()
+        self.window.after(HEALTH_INTERVAL_MS, self.sample_health)
+        # Процессы извлечения импортируют yt-dlp сами, к первому клику они уже готовы
+        self.extraction_pool.start()
+
+    def init_vlc(self):
+        # python-vlc загружает libvlc при импорте, поэтому только после первой отрисовки окна
+        import vlc
+
+        # Initialize VLC with error handling
+        try:
+            self.instance = vlc.Instance(instance_options(Settings.PLAYBACK_PROFILE))
+            if not self.instance:
+                raise Exception("Failed to create VLC instance")
+
+            self.player = self.instance.media_player_new()
+            if not self.player:
+                raise Exception("Failed to create media player")
+        except Exception as e:
+            print(f"Error initializing VLC: {e}")
+            messagebox.showerror("Error", "Failed to initialize VLC player. Please check VLC installation.")
+            sys.exit(1)
 
-        # Запуск потока обновления прогресса
-        self.update_thread = threading.Thread(
-            target=self.update_progress, daemon=True)
-        self.update_thread.start()
+        events = self.player.event_manager()
+        events.event_attach(
+            vlc.EventType.MediaPlayerEncounteredError, self.on_player_error)
+        events.event_attach(
+            vlc.EventType.MediaPlayerPlaying, self.on_player_playing)
+        events.event_attach(
+            vlc.EventType.MediaPlayerTimeChanged, self.on_time_changed)
+        events.event_attach(
+            vlc.EventType.MediaPlayerLengthChanged, self.on_length_changed)
+        events.event_attach(
+            vlc.EventType.MediaPlayerEndReached, self.on_end_reached)
+        events.event_attach(
+            vlc.EventType.MediaPlayerBuffering, self.on_buffering)
+        events.event_attach(
+            vlc.EventType.MediaPlayerVout, self.on_vout)
+        self.player.audio_set_volume(int(self.controls.volume_slider.get()))
+
+    def restart_vlc(self):
+        """Recreate VLC with the current profile's options and resume the current video"""
+        if self.player is None:
+            return  # not started yet, init_vlc will pick the profile up
+        resume = self.current_video_id and self.is_playing
+        position = max(self.player.get_time(), 0)
+        self.player.stop()
+        self.release_media()
+        self.player.release()
+        self.instance.release()
+        self.init_vlc()
+        if resume:
+            self.load_video(self.current_video_id, self.current_title, position,
+                            self.current_audio_only)
+
+    def release_media(self):
+        """Drop our reference to the last media; the player keeps its own while it plays it"""
+        if self.media is not None:
+            self.media.release()
+            self.media = None
 
     def create_menu(self):
         self.menu_frame = ctk.CTkFrame(self.window)
@@ -105,6 +284,42 @@ class YouTubePlayer:
         )
         self.quality_menu.pack(side="left", padx=5)
 
+        # Режим "только звук"
+        self.audio_only_var = ctk.BooleanVar(value=Settings.AUDIO_ONLY)
+        self.audio_only_switch = ctk.CTkSwitch(
+            self.menu_frame,
+            text="Audio only",
+            variable=self.audio_only_var,
+            command=self.toggle_audio_only
+        )
+        self.audio_only_switch.pack(side="left", padx=5)
+
+        # Прогресс фоновой загрузки в кэш, виден только во время загрузки
+        self.download_progress = ctk.CTkProgressBar(self.menu_frame, width=80)
+        self.download_progress.set(0)
+
+        # Очередь воспроизведения
+        self.queue_button = ctk.CTkButton(
+            self.menu_frame,
+            text="📋 Queue",
+            width=40,
+            command=self.show_queue,
+            fg_color=Settings.BUTTON_NORMAL_COLOR,
+            hover_color=Settings.BUTTON_HOVER_COLOR
+        )
+        self.queue_button.pack(side="left", padx=5)
+
+        # Кнопка диагностики
+        self.diagnostics_button = ctk.CTkButton(
+            self.menu_frame,
+            text="📊",
+            width=40,
+            command=self.show_diagnostics,
+            fg_color=Settings.BUTTON_NORMAL_COLOR,
+            hover_color=Settings.BUTTON_HOVER_COLOR
+        )
+        self.diagnostics_button.pack(side="right", padx=5)
+
         # Кнопка настроек
         self.settings_button = ctk.CTkButton(
             self.menu_frame,
@@ -152,22 +367,126 @@ class YouTubePlayer:
 
             self.is_video_fullscreen = False
 
+    def toggle_audio_only(self):
+        Settings.AUDIO_ONLY = self.audio_only_var.get()
+        self.save_settings()
+        # Текущее видео перезапускается в новом режиме с той же позиции
+        if self.current_video_id and self.current_audio_only != Settings.AUDIO_ONLY:
+            self.load_video(self.current_video_id, self.current_title,
+                            max(self.player.get_time(), 0))
+
+    def show_result_menu(self, record, event):
+        menu = Menu(self.window, tearoff=0)
+        menu.add_command(
+            label="Play",
+            command=lambda: self.load_video(record['video_id'], record['title'], audio_only=False))
+        menu.add_command(
+            label="Play audio only",
+            command=lambda: self.load_video(record['video_id'], record['title'], audio_only=True))
+        menu.add_command(label="Add to queue", command=lambda: self.add_to_queue(record))
+        menu.tk_popup(event.x_root, event.y_root)
+
+    def show_queue(self):
+        if self.queue_window is not None and self.queue_window.winfo_exists():
+            self.queue_window.focus()
+            return
+        self.queue_window = QueueWindow(self.window, self.play_queue, self.play_from_queue)
+
+    def add_to_queue(self, record):
+        self.play_queue.add(record)
+        self.refresh_queue()
+        # Первый элемент очереди разрешается заранее, как строка под курсором
+        if len(self.play_queue) == 1:
+            self.prefetcher.hover(record['video_id'])
+
+    def refresh_queue(self):
+        self.queue_button.configure(
+            text=f"📋 Queue ({len(self.play_queue)})" if len(self.play_queue) else "📋 Queue")
+        if self.queue_window is not None and self.queue_window.winfo_exists():
+            self.queue_window.refresh()
+
+    def next_record(self):
+        """Queue head, or with autoplay the search result after the current video"""
+        if len(self.play_queue):
+            return self.play_queue.peek()
+        if not Settings.AUTOPLAY:
+            return None
+        records = self.results_list.records
+        for position, record in enumerate(records[:-1]):
+            if record['video_id'] == self.current_video_id:
+                return records[position + 1]
+        return None
+
+    def play_from_queue(self, index=None):
+        """Play queue item `index`, or whatever comes next when it is None"""
+        if index is not None:
+            record = self.play_queue.items[index]
+            self.play_queue.remove(index)
+        elif len(self.play_queue):
+            record = self.play_queue.pop()
+        else:
+            record = self.next_record()
+        self.refresh_queue()
+        if record:
+            self.load_video(record['video_id'], record['title'])
+
+    def preload_next(self):
+        """Resolve the next item and start buffering it through the proxy"""
+        record = self.next_record()
+        if record is None:
+            return
+        threading.Thread(
+            target=self.preload,
+            args=(record['video_id'], self.quality_var.get(), Settings.AUDIO_ONLY),
+            name="preload-next",
+            daemon=True
+        ).start()
+
+    def preload(self, video_id, quality, audio_only):
+        # Фоновый поток: извлечение форматов и первые фрагменты следующего видео
+        start = time.perf_counter()
+        try:
+            if self.media_cache.path_for(video_id):
+                return
+            index = resolve(video_id, self.stream_cache, self.extraction_pool, background=True)
+            bandwidth = self.bandwidth.budget() if quality == "Auto" else None
+            urls = index.choose(quality, bandwidth, audio_only)
+            if self.proxy:
+                for url in urls:
+                    if url and index.is_direct_url(url):
+                        self.proxy.preload(url)
+        except Exception as e:
+            print(f"Error preloading {video_id}: {str(e)}")
+            return
+        self.metrics.record('preload', time.perf_counter() - start, video_id=video_id)
+
     def change_quality(self, quality):
-        """Switch video quality while playing"""
-        if hasattr(self, 'available_formats') and self.current_video_id:
-            # Store current position
-            current_time = self.player.get_time()
-            
-            # Reload video with new quality
-            self.load_video(self.current_video_id, self.current_title)
-            
-            # Restore position
-            self.player.set_time(current_time)
+        """Switch video quality while playing, without re-extracting the video"""
+        if self.current_index is None or self.current_audio_only:
+            return
+        start = time.perf_counter()
+        # "Auto" picks within the throughput budget, as for a new video, and
+        # every choice stays under the playback health cap
+        bandwidth = self.bandwidth.budget() if quality == "Auto" else None
+        quality = self.capped_quality(self.current_index, quality, bandwidth)
+        try:
+            playback_url, audio_url = self.current_index.playback_urls(quality, bandwidth)
+        except Exception as e:
+            print(f"Error changing quality: {str(e)}")
+            return
+        if (playback_url, audio_url) == (self.current_url, self.current_audio_url):
+            return
+
+        # Swap the media at the current position; the first Playing event
+        # after this marks the end of the switch
+        self.quality_switch_started = start
+        self.play_url(playback_url, max(self.player.get_time(), 0), audio_url)
+        self.metrics.record('quality.swap', time.perf_counter() - start, quality=quality)
 
     def show_settings(self):
         settings_window = ctk.CTkToplevel(self.window)
         settings_window.title("Settings")
-        settings_window.geometry("400x300")
+        settings_window.geometry("400x480")
 
         # Выбор темы
         theme_frame = ctk.CTkFrame(settings_window)
@@ -207,11 +526,97 @@ class YouTubePlayer:
             autoplay_frame, variable=self.autoplay_var)
         autoplay_switch.pack(side="left", padx=5)
 
+        # Кэширование просмотренных видео на диск
+        media_cache_frame = ctk.CTkFrame(settings_window)
+        media_cache_frame.pack(pady=10, padx=10, fill="x")
+
+        ctk.CTkLabel(media_cache_frame, text="Cache watched videos:").pack(
+            side="left", padx=5)
+        self.media_cache_var = ctk.BooleanVar(value=Settings.MEDIA_CACHE_ENABLED)
+        media_cache_switch = ctk.CTkSwitch(
+            media_cache_frame, variable=self.media_cache_var)
+        media_cache_switch.pack(side="left", padx=5)
+
+        # Профиль воспроизведения VLC
+        profile_frame = ctk.CTkFrame(settings_window)
+        profile_frame.pack(pady=10, padx=10, fill="x")
+
+        ctk.CTkLabel(profile_frame, text="Playback profile:").pack(
+            side="left", padx=5)
+        profile_menu = ctk.CTkOptionMenu(
+            profile_frame,
+            values=list(PROFILES),
+            variable=ctk.StringVar(value=Settings.PLAYBACK_PROFILE),
+            command=self.change_playback_profile
+        )
+        profile_menu.pack(side="left", padx=5)
+
+        # Замеры по профилям: медиана времени до первого кадра и остановки в час
+        ctk.CTkLabel(
+            settings_window,
+            text=self.profile_summary_text(),
+            justify="left"
+        ).pack(pady=5, padx=10, anchor="w")
+
         # Кнопка сохранения настроек
         save_button = ctk.CTkButton(
             settings_window, text="Save", command=lambda: self.save_settings_and_close(settings_window))
         save_button.pack(pady=20)
 
+    def show_diagnostics(self):
+        if self.diagnostics_window is not None and self.diagnostics_window.winfo_exists():
+            self.diagnostics_window.focus()
+            return
+        self.diagnostics_window = DiagnosticsWindow(
+            self.window, self.metrics, self.diagnostics_counters, self.toggle_metrics)
+
+    def toggle_metrics(self, enabled):
+        Settings.METRICS_ENABLED = enabled
+        self.metrics.set_enabled(enabled)
+        self.save_settings()
+
+    def diagnostics_counters(self):
+        rates = self.health.rates()
+        health = self.health_text(rates) if rates else "no samples yet"
+        if self.health_cap:
+            health += f", capped at {self.health_cap}p"
+        lines = [
+            "Network: {requests} requests, {connections} connections, {reuse_rate:.0%} reused, "
+            "{handshake_ms_avg:.0f} ms per handshake".format(**net.stats()),
+            "Search cache: {memory_hits} memory / {disk_hits} disk hits, {misses} misses".format(
+                **self.search_cache.stats()),
+            "Stream cache: {hits} hits, {misses} misses, {expired} expired, {entries} entries".format(
+                **self.stream_cache.stats()),
+            "Prefetch: {prefetched} prefetched, hit rate {hit_rate:.0%}, {saved_ms:.0f} ms saved".format(
+                **self.prefetcher.stats()),
+            f"Playback health: {health}",
+            "Library: {videos} videos, {played} played, {pending_writes} writes pending".format(
+                **self.library.stats()),
+            f"Media cache: {self.media_cache.usage() / 1e6:.0f} of "
+            f"{self.media_cache.budget_bytes / 1e6:.0f} MB used",
+        ]
+        if self.proxy:
+            stats = self.proxy.stats()
+            throughput = stats['throughput']
+            lines.append(
+                f"Proxy: {stats['memory_hits']} memory / {stats['disk_hits']} disk hits, "
+                f"{stats['misses']} misses, "
+                + (f"{throughput * 8 / 1e6:.1f} Mbit/s" if throughput else "no throughput yet"))
+        estimate = self.bandwidth.estimate()
+        if estimate:
+            lines.append(f"Bandwidth estimate: {estimate * 8 / 1e6:.1f} Mbit/s, "
+                         f"safety {self.bandwidth.safety:.2f}")
+        audio_cpu, audio_wall = self.cpu_usage[True]
+        video_cpu, video_wall = self.cpu_usage[False]
+        if audio_wall > 0 and video_wall > 0:
+            lines.append(f"CPU: {audio_cpu / audio_wall:.0%} audio only vs "
+                         f"{video_cpu / video_wall:.0%} with video")
+        if self.audio_savings:
+            audio_kbps, video_kbps = self.audio_savings
+            lines.append(f"Audio only: {audio_kbps:.0f} kbps instead of {video_kbps:.0f} kbps "
+                         f"({1 - audio_kbps / video_kbps:.0%} less data)")
+        return lines
+
     def show_about(self):
         about_window = ctk.CTkToplevel(self.window)
         about_window.title("About")
@@ -237,14 +642,30 @@ class YouTubePlayer:
         Settings.DEFAULT_QUALITY = quality
         self.save_settings()
         self.quality_var.set(quality)
-        # Если видео воспроизводится, перезагрузить его с новым качеством
+        # Если видео воспроизводится, переключить его на новое качество
         if self.current_video_id and self.is_playing:
-            current_time = self.player.get_time()
-            self.load_video(self.current_video_id, self.current_title)
-            self.player.set_time(current_time)
+            self.change_quality(quality)
+
+    def change_playback_profile(self, profile):
+        Settings.PLAYBACK_PROFILE = profile
+        self.save_settings()
+        self.restart_vlc()
+
+    def profile_summary_text(self):
+        lines = []
+        for profile, stats in self.profile_stats.summary().items():
+            parts = []
+            if stats['ttff_median'] is not None:
+                parts.append(f"first frame {stats['ttff_median']:.2f} s")
+            if stats['stalls_per_hour'] is not None:
+                parts.append(f"{stats['stalls_per_hour']:.1f} stalls/h")
+            parts.append(f"{stats['videos']} videos")
+            lines.append(f"{profile}: " + ", ".join(parts))
+        return "\n".join(lines) or "No playback measurements yet"
 
     def save_settings_and_close(self, window):
         Settings.AUTOPLAY = self.autoplay_var.get()
+        Settings.MEDIA_CACHE_ENABLED = self.media_cache_var.get()
         self.save_settings()
         window.destroy()
 
@@ -253,7 +674,11 @@ class YouTubePlayer:
             'theme': Settings.THEME,
             'default_quality': Settings.DEFAULT_QUALITY,
             'autoplay': Settings.AUTOPLAY,
-            'default_volume': Settings.DEFAULT_VOLUME  # Сохраняем DEFAULT_VOLUME
+            'default_volume': Settings.DEFAULT_VOLUME,  # Сохраняем DEFAULT_VOLUME
+            'media_cache': Settings.MEDIA_CACHE_ENABLED,
+            'audio_only': Settings.AUDIO_ONLY,
+            'playback_profile': Settings.PLAYBACK_PROFILE,
+            'metrics': Settings.METRICS_ENABLED
         }
         with open('settings.json', 'w') as f:
             json.dump(settings, f)
@@ -273,179 +698,369 @@ class YouTubePlayer:
                     Settings.DEFAULT_VOLUME = settings.get('default_volume', 100)
                 else:
                     Settings.DEFAULT_VOLUME = 100  # Default volume
+                Settings.MEDIA_CACHE_ENABLED = settings.get('media_cache', False)
+                Settings.AUDIO_ONLY = settings.get('audio_only', False)
+                profile = settings.get('playback_profile', DEFAULT_PROFILE)
+                Settings.PLAYBACK_PROFILE = profile if profile in PROFILES else DEFAULT_PROFILE
+                Settings.METRICS_ENABLED = settings.get('metrics', False)
         else:
             # Установить настройки по умолчанию
             Settings.THEME = 'System'
             Settings.DEFAULT_QUALITY = 'Auto'
             Settings.DEFAULT_VOLUME = 100
             Settings.AUTOPLAY = False
+            Settings.MEDIA_CACHE_ENABLED = False
+            Settings.AUDIO_ONLY = False
+            Settings.PLAYBACK_PROFILE = DEFAULT_PROFILE
+            Settings.METRICS_ENABLED = False
 
     def search_videos(self):
         query = self.search_frame.search_entry.get()
         if not query:
             return
 
-        for widget in self.results_frame.winfo_children():
-            widget.destroy()
+        self.continuation = None
+        self.loading_more = False
+        self.prefetcher.cancel()
+        self.results_list.show_message("Searching...")
 
-        try:
-            loading_label = ctk.CTkLabel(
-                self.results_frame, text="Searching...")
-            loading_label.pack()
-            self.window.update()
-
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-            url = f"https://www.youtube.com/results?search_query={query.replace(' ', '+')}"
-            response = requests.get(url, headers=headers)
-
-            loading_label.destroy()
-
-            if response.status_code != 200:
-                raise Exception("Failed to fetch search results")
-
-            soup = BeautifulSoup(response.text, 'html.parser')
-            scripts = soup.find_all('script')
-
-            for script in scripts:
-                if 'var ytInitialData = ' in str(script):
-                    data = str(script).split(
-                        'var ytInitialData = ')[1].split(';</script>')[0]
-                    json_data = json.loads(data)
-
-                    items = json_data['contents']['twoColumnSearchResultsRenderer']['primaryContents'][
-                        'sectionListRenderer']['contents'][0]['itemSectionRenderer']['contents']
-
-                    for item in items:
-                        if 'videoRenderer' in item:
-                            video = item['videoRenderer']
-                            video_id = video['videoId']
-                            title = video['title']['runs'][0]['text']
-
-                            result_button = ctk.CTkButton(
-                                self.results_frame,
-                                text=title,
-                                command=lambda v_id=video_id, t=title: self.load_video(
-                                    v_id, t),
-                                height=40,
-                                fg_color=Settings.BUTTON_NORMAL_COLOR,
-                                hover_color=Settings.BUTTON_HOVER_COLOR
-                            )
-                            result_button.pack(
-                                pady=5, padx=10, fill="x")
-                    break
+        # Загрузка и разбор выполняются в фоне, окно остаётся отзывчивым
+        self.search_executor.submit(
+            query,
+            lambda page, timings: self.show_results(query, page, timings),
+            self.show_search_error
+        )
+
+    def on_search_typed(self, event):
+        # Локальные совпадения показываются, когда ввод замирает на SUGGEST_DELAY_MS
+        if self.suggest_job is not None:
+            self.window.after_cancel(self.suggest_job)
+        self.suggest_job = self.window.after(SUGGEST_DELAY_MS, self.show_local_matches)
 
+    def show_local_matches(self):
+        self.suggest_job = None
+        query = self.search_frame.search_entry.get()
+        with self.metrics.span('library.search'):
+            matches = self.library.search(query, Settings.LIBRARY_SUGGESTIONS)
+        if matches:
+            self.continuation = None  # the list no longer shows the previous search
+            self.results_list.set_records(matches)
+
+    def merge_local(self, query, records):
+        """Local library matches for query ahead of the remote records, without duplicates"""
+        local = self.library.search(query, Settings.LIBRARY_SUGGESTIONS)
+        seen = {record['video_id'] for record in local}
+        return local + [record for record in records if record['video_id'] not in seen]
+
+    def play_record(self, record):
+        """Play a result, resuming where it was left off last time"""
+        start_time = 0
+        saved = self.library.position(record['video_id'])
+        if saved:
+            position, length = saved
+            if position > RESUME_MIN_SECONDS and length - position > RESUME_END_SECONDS:
+                start_time = position * 1000
+        self.load_video(record['video_id'], record['title'], start_time)
+
+    def save_position(self):
+        if self.current_video_id and self.progress_length > 0:
+            self.library.set_position(
+                self.current_video_id, self.progress_time / 1000, self.progress_length / 1000)
+
+    def show_results(self, query, page, timings):
+        start = time.perf_counter()
+        self.library.add_records(page['records'])
+        records = self.merge_local(query, page['records'])
+        self.continuation = page['continuation']
+        self.results_list.set_records(records)
+        self.prefetcher.prefetch_results(records)
+
+        timings['render'] = time.perf_counter() - start
+        for stage, seconds in timings.items():
+            self.metrics.record(f"search.{stage}", seconds, query=query)
+
+    def load_more_results(self):
+        """Fetch the next page when the list is scrolled close to its end"""
+        if self.loading_more or not self.continuation:
+            return
+        self.loading_more = True
+        self.search_executor.submit_continuation(
+            self.continuation, self.append_results, self.show_load_more_error)
+
+    def append_results(self, page, timings):
+        self.loading_more = False
+        self.continuation = page['continuation']
+        self.library.add_records(page['records'])
+        shown = {record['video_id'] for record in self.results_list.records}
+        self.results_list.append_records(
+            record for record in page['records'] if record['video_id'] not in shown)
+
+    def show_load_more_error(self, error):
+        # Оставляем уже загруженные результаты, следующая прокрутка повторит запрос
+        self.loading_more = False
+        print(f"Error loading more results: {str(error)}")
+
+    def show_search_error(self, error):
+        self.metrics.event('error', stage='search', message=str(error))
+        self.results_list.show_message(f"Error: {str(error)}", "red")
+
+    def load_video(self, video_id, title, start_time=0, audio_only=None):
+        if audio_only is None:
+            audio_only = Settings.AUDIO_ONLY
+        # Новый клик отменяет ещё не начатое извлечение предыдущего видео
+        self.load_generation += 1
+        if self.pending_extraction is not None:
+            self.pending_extraction.cancel()
+            self.pending_extraction = None
+        self.now_playing.configure(text=f"Loading: {title}")
+        self.load_started = time.perf_counter()
+        # Извлечение и выбор потока идут в фоне, окно не замирает
+        threading.Thread(
+            target=self.prepare_video,
+            args=(self.load_generation, video_id, title, start_time, audio_only,
+                  self.quality_var.get()),
+            name="load-video",
+            daemon=True
+        ).start()
+
+    def prepare_video(self, generation, video_id, title, start_time, audio_only, quality):
+        """Background half of load_video: find the streams, then start playback on the Tk thread"""
+        try:
+            # Полностью скачанное видео играется с диска, без извлечения форматов
+            local_path = self.media_cache.path_for(video_id)
+            if local_path:
+                index = None
+                playback_url, audio_url = local_path, None
+            else:
+                # Format index is reused between clicks and quality changes
+                # until the stream URLs are about to expire
+                saved = self.prefetcher.claim(video_id)
+                index = self.stream_cache.get(video_id)
+                if index is None:
+                    future = self.pending_extraction = self.extraction_pool.submit(video_id)
+                    if generation != self.load_generation:
+                        future.cancel()  # superseded while the prefetch was awaited
+                    with self.metrics.span('extract', video_id=video_id):
+                        index = FormatIndex(future.result())
+                    self.stream_cache.put(video_id, index)
+                if saved is not None:
+                    self.metrics.record('prefetch.saved', saved, video_id=video_id)
+                bandwidth = self.auto_bandwidth(index) if quality == "Auto" else None
+                quality = self.capped_quality(index, quality, bandwidth)
+                playback_url, audio_url = index.choose(quality, bandwidth, audio_only)
+                if audio_only:
+                    self.report_audio_savings(index, index.select(quality, bandwidth))
+
+                if Settings.MEDIA_CACHE_ENABLED:
+                    # Кэш хранит один файл без склейки: для DASH берётся лучший совмещённый формат
+                    video, audio = index.select(quality, bandwidth) or (None, None)
+                    direct = video is not None and audio is None and index.is_direct_url(video['url'])
+                    self.media_cache.enqueue(video_id, video['format_id'] if direct else None)
+        except CancelledError:
+            return
         except Exception as e:
-            error_label = ctk.CTkLabel(
-                self.results_frame,
-                text=f"Error: {str(e)}",
-                text_color="red"
-            )
-            error_label.pack()
-
-    def load_video(self, video_id, title):
+            print(f"Error loading video: {str(e)}")
+            self.metrics.event('error', stage='load', video_id=video_id, message=str(e))
+            self.window.after(0, lambda: self.show_load_error(generation))
+            return
+
+        self.window.after(0, lambda: self.start_video(
+            generation, video_id, title, start_time, audio_only, index, playback_url, audio_url))
+
+    def start_video(self, generation, video_id, title, start_time, audio_only,
+                    index, playback_url, audio_url):
+        if generation != self.load_generation:
+            return  # another video was clicked in the meantime
+        self.pending_extraction = None
+        self.metrics.record('load.prepare', time.perf_counter() - self.load_started, video_id=video_id)
         try:
-            default_quality = Settings.DEFAULT_QUALITY
-            format_spec = 'best'
-
-            if default_quality != "Auto":
-                quality_height = default_quality[:-1]  # Remove 'p' from '720p' etc
-                format_spec = f'bestvideo[height<={quality_height}]+bestaudio/best[height<={quality_height}]'
-
-            ydl_opts = {
-                'format': format_spec,
-                'quiet': True,
-                'no_warnings': True,
-                'extract_flat': False
-            }
-
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                url = f"https://www.youtube.com/watch?v={video_id}"
-                info = ydl.extract_info(url, download=False)
-                
-                # Get playable URL
-                playback_url = None
-                if 'formats' in info:
-                    formats = info['formats']
-                    # Filter formats by quality
-                    if default_quality != "Auto":
-                        try:
-                            height = int(default_quality[:-1])
-                            # Filter formats safely handling None values
-                            suitable_formats = []
-                            for f in formats:
-                                format_height = f.get('height')
-                                if format_height is not None and format_height <= height:
-                                    if f.get('acodec') != 'none':
-                                        suitable_formats.append(f)
-                            
-                            if suitable_formats:
-                                # Get highest quality format within limit
-                                selected_format = max(suitable_formats, 
-                                                   key=lambda x: x.get('height', 0))
-                                playback_url = selected_format['url']
-                        except (ValueError, TypeError):
-                            # Fallback to best if quality parsing fails
-                            playback_url = formats[-1]['url']
-                    else:
-                        # Use best format
-                        playback_url = formats[-1]['url']
-                
-                if not playback_url and 'url' in info:
-                    # Fallback to direct URL
-                    playback_url = info['url']
-                    
-                if not playback_url:
-                    raise Exception("No playable URL found")
-
-                # Create media
-                media = self.instance.media_new(playback_url)
-                self.player.set_media(media)
-
-                # Set video window
-                if os.name == 'nt':
-                    self.player.set_hwnd(self.video_frame.winfo_id())
-                else:
-                    self.player.set_xwindow(self.video_frame.winfo_id())
-
-                # Update state
-                self.current_url = playback_url
-                self.current_video_id = video_id
-                self.current_title = title
-                
-                # Update UI
-                self.now_playing.configure(text=f"Now Playing: {title}")
-                
-                # Start playback
-                if not self.is_playing:
-                    self.player.play()
-                    self.is_playing = True
-                    self.controls.play_button.configure(text="⏸️ Pause")
+            if video_id != self.current_video_id:
+                self.refreshed_video_id = None
+                # Stalls of the previous video tune how boldly "Auto" picks the next one
+                if self.current_video_id:
+                    self.bandwidth.video_finished(self.stall_count)
+                    self.profile_stats.video_finished(
+                        Settings.PLAYBACK_PROFILE, self.stall_count, self.progress_time / 1000)
+                    self.save_position()
+                self.stall_count = 0
+                self.library.played(video_id, title)
+
+            # Update state
+            self.current_index = index
+            self.storyboards.set_storyboard(video_id, index.info.get('storyboards') if index else None)
+            self.current_video_id = video_id
+            self.current_title = title
+
+            self.play_url(playback_url, start_time, audio_url, audio_only)
+
+            # Update UI
+            prefix = "Now Playing (audio)" if audio_only else "Now Playing"
+            self.now_playing.configure(text=f"{prefix}: {title}")
+            self.update_quality_menu()
 
         except Exception as e:
             print(f"Error loading video: {str(e)}")
+            self.show_load_error(generation)
+
+    def show_load_error(self, generation):
+        if generation == self.load_generation:
             self.now_playing.configure(text=f"Error: Could not load video")
 
+    def auto_bandwidth(self, index):
+        """Throughput budget (bytes/s) for "Auto", probing the link if nothing was measured yet"""
+        if self.proxy:
+            self.bandwidth.observe(self.proxy.throughput())
+        if self.bandwidth.estimate() is None:
+            candidate = index.select("Auto")
+            if candidate:
+                self.bandwidth.probe(candidate[0]['url'])
+        return self.bandwidth.budget()
+
+    def play_url(self, playback_url, start_time=0, audio_url=None, audio_only=False):
+        self.record_cpu_usage()
+
+        # Create media
+        self.media_started = time.perf_counter()
+        with self.metrics.span('media.create', profile=Settings.PLAYBACK_PROFILE):
+            media = self.instance.media_new(self.media_url(playback_url))
+            if audio_only:
+                media.add_option(":no-video")
+            for option in media_options(Settings.PLAYBACK_PROFILE):
+                media.add_option(option)
+            if audio_url:
+                # Separate DASH audio track; VLC keeps it in sync by timestamps
+                # and seeks it together with the video
+                media.add_option(f":input-slave={self.media_url(audio_url)}")
+            if start_time > 0:
+                media.add_option(f":start-time={start_time / 1000:.3f}")
+            self.player.set_media(media)
+            self.release_media()
+            self.media = media
+
+        # Set video window
+        if os.name == 'nt':
+            self.player.set_hwnd(self.video_frame.winfo_id())
+        else:
+            self.player.set_xwindow(self.video_frame.winfo_id())
+
+        self.current_url = playback_url
+        self.current_audio_url = audio_url
+        self.current_audio_only = audio_only
+        self.has_played = False
+        self.buffering = False
+        self.end_stall()
+        self.health.reset()
+        self.cpu_sample = (time.process_time(), time.perf_counter())
+        # Quality switches are timed separately (on_player_playing)
+        if self.quality_switch_started is None:
+            self.first_frame_started = time.perf_counter()
+
+        # Start playback; set_media stops whatever was playing before
+        self.play()
+
+    def report_audio_savings(self, index, selected):
+        """Note how much less data audio-only needs than the video that would have played"""
+        audio_rate = index.rate(index.audio)
+        video_rate = index.rate(*selected) if selected else None
+        if audio_rate and video_rate:
+            self.audio_savings = (audio_rate * 8 / 1000, video_rate * 8 / 1000)
+            self.metrics.event('audio_only', audio_kbps=round(self.audio_savings[0]),
+                               video_kbps=round(self.audio_savings[1]))
+
+    def record_cpu_usage(self):
+        """Add process CPU time since the last media change to the current mode's total
+
+        VLC decodes inside this process, so the CPU share per mode shows
+        what audio-only playback saves (paused time is included).
+        """
+        if self.cpu_sample is None:
+            return
+        cpu_start, wall_start = self.cpu_sample
+        self.cpu_sample = None
+        usage = self.cpu_usage[self.current_audio_only]
+        usage[0] += time.process_time() - cpu_start
+        usage[1] += time.perf_counter() - wall_start
+
+    def media_url(self, url):
+        # Remote files go through the local read-ahead proxy; HLS/DASH
+        # manifests have no byte ranges and are played directly
+        if self.proxy and self.current_index is not None and self.current_index.is_direct_url(url):
+            return self.proxy.register(url)
+        return url
+
+    def on_player_playing(self, event):
+        now = time.perf_counter()
+        if self.media_started is not None:
+            self.metrics.record('media.playing', now - self.media_started,
+                                profile=Settings.PLAYBACK_PROFILE)
+            self.media_started = None
+        started = self.quality_switch_started
+        if started is not None:
+            self.quality_switch_started = None
+            self.metrics.record('quality.switch', now - started)
+
+    def on_vout(self, event):
+        # Вызывается из потока VLC: время фиксируется сразу, запись — в потоке Tk
+        if event.u.new_count > 0:
+            self.vlc_events.put((self.record_first_frame, time.perf_counter()))
+
+    def record_first_frame(self, now):
+        started = self.first_frame_started
+        if started is None:
+            return
+        self.first_frame_started = None
+        seconds = now - started
+        self.profile_stats.first_frame(Settings.PLAYBACK_PROFILE, seconds)
+        self.metrics.record('first_frame', seconds, profile=Settings.PLAYBACK_PROFILE,
+                            video_id=self.current_video_id)
+        if self.load_started is not None:
+            self.metrics.record('click_to_first_frame', now - self.load_started,
+                                video_id=self.current_video_id)
+            self.load_started = None
+
+    def on_player_error(self, event):
+        self.metrics.event('error', stage='playback', video_id=self.current_video_id)
+        # Вызывается из потока VLC, обработка переносится в поток Tk
+        self.vlc_events.put((self.refresh_expired_stream,))
+
+    def refresh_expired_stream(self):
+        """Re-resolve the current video once when VLC fails to open its stream (e.g. 403)"""
+        video_id = self.current_video_id
+        if not video_id or self.refreshed_video_id == video_id:
+            self.now_playing.configure(text=f"Error: Could not play video")
+            return
+        self.refreshed_video_id = video_id
+        position = max(self.player.get_time(), 0)
+        self.stream_cache.invalidate(video_id)
+        self.load_video(video_id, self.current_title, position)
+
     def download_progress_hook(self, d):
+        # Вызывается из потока загрузки yt-dlp
         if d['status'] == 'downloading':
-            # Update progress bar if needed
-            progress = (d['downloaded_bytes'] / d['total_bytes']) 
-            if hasattr(self, 'download_progress'):
-                self.download_progress.set(progress)
-                
+            total = d.get('total_bytes') or d.get('total_bytes_estimate')
+            if total:
+                progress = d['downloaded_bytes'] / total
+                self.window.after(0, lambda: self.show_download_progress(progress))
+        elif d['status'] in ('finished', 'error'):
+            self.window.after(0, lambda: self.show_download_progress(None))
+
+    def show_download_progress(self, progress):
+        if progress is None:
+            self.download_progress.pack_forget()
+            return
+        if not self.download_progress.winfo_ismapped():
+            self.download_progress.pack(side="left", padx=5)
+        self.download_progress.set(progress)
+
     def update_quality_menu(self):
-        """Update quality menu with available formats"""
-        if hasattr(self, 'available_formats'):
-            qualities = sorted(set(
-                f"{f.get('height', 0)}p" 
-                for f in self.available_formats 
-                if f.get('height')
-            ))
-            self.quality_menu.configure(values=qualities)
+        """Update quality menu with the qualities the current video actually has"""
+        if self.current_index is not None:
+            self.quality_menu.configure(values=self.current_index.qualities())
 
     def play(self):
         self.player.play()
         self.is_playing = True
+        self.start_vlc_polling()
         self.controls.play_button.configure(text="⏸️ Pause")
 
     def play_pause(self):
@@ -461,16 +1076,20 @@ class YouTubePlayer:
 
     def stop(self):
         if self.current_url:
+            self.record_cpu_usage()
             self.player.stop()
             self.is_playing = False
             self.controls.play_button.configure(text="▶️ Play")
-            self.controls.progress_bar.set(0)
             self.now_playing.configure(text="")
-            self.controls.current_time.configure(text="0:00")
-            self.controls.total_time.configure(text="0:00")
+            self.save_position()
+            self.controls.health_label.configure(text="")
+            self.progress_time = 0
+            self.progress_length = 0
+            self.show_progress(0, 0)
 
     def set_volume(self, value):
-        self.player.audio_set_volume(int(value))
+        if self.player:
+            self.player.audio_set_volume(int(value))
         if int(value) == 0:
             self.controls.volume_label.configure(text="🔇")
         elif int(value) < 50:
@@ -478,21 +1097,208 @@ class YouTubePlayer:
         else:
             self.controls.volume_label.configure(text="🔊")
 
-    def update_progress(self):
+    def seek(self, fraction, final):
+        """Seek from the progress bar; while dragging only the last position is applied"""
+        if self.progress_length <= 0 or not self.player or not self.player.is_seekable():
+            return
+        self.seek_target = int(fraction * self.progress_length)
+        if self.seek_job is not None:
+            self.window.after_cancel(self.seek_job)
+            self.seek_job = None
+        if final:
+            self.apply_seek()
+        else:
+            self.seek_job = self.window.after(SEEK_DEBOUNCE_MS, self.apply_seek)
+
+    def apply_seek(self):
+        self.seek_job = None
+        if self.seek_target is None:
+            return
+        target, self.seek_target = self.seek_target, None
+        # The rebuffer after a seek is not a stall: stall accounting (bandwidth
+        # safety, profile stats, health) resumes with the next TimeChanged
+        self.end_stall()
+        self.has_played = False
+        self.player.set_time(target)
+        self.progress_time = target
+        self.shown_progress = self.shown_progress[:2] + (None,)  # redraw the bar on the next update
+        self.metrics.event('seek', video_id=self.current_video_id, ms=target)
+
+    def preview_seek(self, fraction, x):
+        if self.progress_length <= 0:
+            return
+        position = int(fraction * self.progress_length)
+        self.controls.show_preview(x, format_time(position))
+        self.storyboards.request(position / 1000, self.controls.set_preview_image)
+
+    def on_time_changed(self, event):
+        self.progress_time = event.u.new_time
+        # Ближе к концу видео следующий элемент готовится заранее
+        if (self.progress_length > 0
+                and self.progress_length - event.u.new_time < PRELOAD_BEFORE_END_MS
+                and self.preloaded_for != self.current_video_id):
+            self.preloaded_for = self.current_video_id
+            self.vlc_events.put((self.preload_next,))
+        if event.u.new_time > 0:
+            if not self.has_played and self.current_audio_only:
+                # Без видео кадров нет: первым считается первый сдвиг времени
+                self.vlc_events.put((self.record_first_frame, time.perf_counter()))
+            self.has_played = True
+
+    def on_buffering(self, event):
+        # Buffering below 100% after playback started is a stall (rebuffer)
+        if event.u.new_cache < 100:
+            if self.has_played and not self.buffering:
+                self.stall_count += 1
+                self.stall_started = time.perf_counter()
+            self.buffering = True
+        else:
+            self.buffering = False
+            self.end_stall()
+
+    def end_stall(self):
+        if self.stall_started is not None:
+            self.stall_seconds += time.perf_counter() - self.stall_started
+            self.stall_started = None
+
+    def sample_health(self):
+        """Read VLC statistics every HEALTH_INTERVAL_MS and act on sustained trouble"""
+        self.window.after(HEALTH_INTERVAL_MS, self.sample_health)
+        if not self.player or not self.is_playing:
+            self.health.reset()  # a pause must not count as one long interval
+            return
+        if self.health_stats is None:
+            import vlc
+            self.health_stats = vlc.MediaStats()
+        # player.get_media() would retain the media on every call without a release
+        counters = media_stats(self.media, self.health_stats)
+        if counters is None:
+            return
+        now = time.perf_counter()
+        stalled = self.stall_seconds + (now - self.stall_started if self.stall_started else 0)
+        self.health.sample(now, counters, stalled)
+        rates = self.health.rates()
+        if rates is None:
+            return
+        self.controls.health_label.configure(text=self.health_text(rates))
+        self.metrics.event('health', video_id=self.current_video_id, **{
+            name: round(value, 4) for name, value in rates.items()})
+        verdict = self.health.verdict()
+        if verdict and Settings.HEALTH_AUTO_QUALITY:
+            self.apply_health(verdict, rates)
+
+    @staticmethod
+    def health_text(rates):
+        return "drops {drop_rate:.1%} · stalls {stall_rate:.0%} · {kbps:.0f} kbps".format(**rates)
+
+    def playing_height(self):
+        if self.current_index is None:
+            return None
+        for height, (video, _) in self.current_index.streams.items():
+            if video['url'] == self.current_url:
+                return height
+        return None
+
+    def capped_quality(self, index, quality, bandwidth):
+        """quality, lowered to the health cap while playback keeps struggling"""
+        cap = self.health_cap
+        selected = index.select(quality, bandwidth)
+        if cap is None or selected is None or selected[0]['height'] <= cap:
+            return quality
+        return f"{cap}p"
+
+    def apply_health(self, verdict, rates):
+        """Step one height down after sustained drops/stalls, or back up after recovery"""
+        height = self.playing_height()
+        if height is None or self.current_audio_only or self.quality_switch_started is not None:
+            return
+        heights = self.current_index.heights()
+        if verdict == "down":
+            lower = [h for h in heights if h < height]
+            target = lower[0] if lower else None
+            if target and self.health_restore is None:
+                self.health_restore = height
+        else:
+            higher = [h for h in heights if height < h <= (self.health_restore or 0)]
+            target = higher[-1] if higher else None
+        if target is None:
+            return
+        if target >= self.health_restore:
+            self.health_cap = self.health_restore = None
+        else:
+            self.health_cap = target
+        print(f"Playback health: {self.health_text(rates)}, switching {height}p -> {target}p")
+        self.metrics.event('quality.auto', video_id=self.current_video_id, direction=verdict,
+                           height=target, **{name: round(value, 4) for name, value in rates.items()})
+        self.change_quality(f"{target}p")
+
+    def on_length_changed(self, event):
+        self.progress_length = event.u.new_length
+
+    def on_end_reached(self, event):
+        self.vlc_events.put((self.on_playback_ended,))
+
+    def start_vlc_polling(self):
+        if not self.vlc_polling:
+            self.vlc_polling = True
+            self.window.after(VLC_POLL_MS, self.poll_vlc_events)
+
+    def poll_vlc_events(self):
+        """Tk thread: run work queued by VLC callbacks and redraw progress
+
+        VLC callbacks never touch Tk themselves: a Tk call from libvlc's
+        event thread blocks it until the main loop answers, while the main
+        loop may be waiting in set_media()/stop() for that same thread.
+        Bursts of TimeChanged events collapse into one redraw per tick.
+        """
         while True:
-            if self.is_playing:
-                try:
-                    length = self.player.get_length()
-                    current = self.player.get_time()
-                    if length > 0:
-                        self.controls.progress_bar.set(current / length)
-                        self.controls.current_time.configure(
-                            text=format_time(current))
-                        self.controls.total_time.configure(
-                            text=format_time(length))
-                except:
-                    pass
-            time.sleep(0.1)
+            try:
+                handler, *args = self.vlc_events.get_nowait()
+            except queue.Empty:
+                break
+            handler(*args)
+        self.show_progress(self.progress_time, self.progress_length)
+        if self.is_playing or not self.vlc_events.empty():
+            self.window.after(VLC_POLL_MS, self.poll_vlc_events)
+        else:
+            self.vlc_polling = False
+
+    def show_progress(self, current, length):
+        """Redraw progress widgets whose displayed value actually changed"""
+        if length > 0:
+            shown = (format_time(current), format_time(length),
+                     round(min(current / length, 1.0), 3))
+        else:
+            shown = ("0:00", "0:00", 0)
+        current_text, total_text, fraction = shown
+        old_current, old_total, old_fraction = self.shown_progress
+        if current_text != old_current:
+            self.controls.current_time.configure(text=current_text)
+        if total_text != old_total:
+            self.controls.total_time.configure(text=total_text)
+        if self.controls.dragging:
+            fraction = old_fraction  # the bar follows the pointer while dragging
+        elif fraction != old_fraction:
+            self.controls.progress_bar.set(fraction)
+        self.shown_progress = (current_text, total_text, fraction)
+
+    def on_playback_ended(self):
+        self.is_playing = False
+        self.controls.play_button.configure(text="▶️ Play")
+        # Очередь и автопроигрывание
+        if len(self.play_queue) or Settings.AUTOPLAY:
+            self.play_from_queue()
 
     def run(self):
-        self.window.mainloop()
\ No newline at end of file
+        self.window.mainloop()
+        self.save_position()
+        self.library.close()
+        self.search_executor.shutdown()
+        self.extraction_pool.shutdown()
+        self.search_cache.close()
+        self.thumbnails.shutdown()
+        self.storyboards.shutdown()
+        self.media_cache.shutdown()
+        if self.proxy:
+            self.proxy.stop()
+        self.metrics.close()
\ No newline at end of file
@@ -0,0 +1,64 @@
+# playqueue.py
+import os
+import json
+
+RECORD_KEYS = ('video_id', 'title', 'duration', 'channel')
+
+
+class PlayQueue:
+    """Records to play next, in order, saved to a JSON file after every change"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.items = self._load()
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, record):
+        self.items.append({key: record.get(key) for key in RECORD_KEYS})
+        self._save()
+
+    def remove(self, index):
+        del self.items[index]
+        self._save()
+
+    def move(self, index, offset):
+        """Move item `index` by `offset` places, clamped to the ends of the queue"""
+        target = min(max(index + offset, 0), len(self.items) - 1)
+        if target != index:
+            self.items.insert(target, self.items.pop(index))
+            self._save()
+
+    def peek(self):
+        return self.items[0] if self.items else None
+
+    def pop(self):
+        if not self.items:
+            return None
+        record = self.items.pop(0)
+        self._save()
+        return record
+
+    def clear(self):
+        self.items = []
+        self._save()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return []
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path + ".tmp", 'w') as f:
+                json.dump(self.items, f)
+            os.replace(self.path + ".tmp", self.path)
+        except OSError as e:
+            print(f"Error saving queue: {str(e)}")
@@ -0,0 +1,123 @@
+# prefetch.py
+import time
+import queue
+import itertools
+import threading
+
+from resolver import resolve
+
+HOVER_PRIORITY = 0
+RESULT_PRIORITY = 1
+
+
+class StreamPrefetcher:
+    """Speculatively resolves format indexes for the results a user is likely to click
+
+    Work goes through a priority queue served by `max_workers` daemon
+    threads: a hovered row jumps ahead of the top search results. Resolved
+    indexes land in the shared StreamCache, where load_video picks them up.
+    Extraction itself runs in `pool` (an ExtractionPool) when one is given.
+    cancel() drops everything still queued (extractions already running
+    finish and are cached anyway).
+    """
+
+    def __init__(self, cache, max_workers=2, top_n=5, pool=None):
+        self.cache = cache
+        self.pool = pool
+        self.top_n = top_n
+        self._queue = queue.PriorityQueue()
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._queued = set()
+        self._in_flight = {}  # video_id -> Event set when its extraction finishes
+        self._durations = {}  # video_id -> seconds the prefetch extraction took
+        self.counters = {'prefetched': 0, 'failed': 0, 'hits': 0, 'misses': 0, 'saved_ms': 0.0}
+
+        for i in range(max_workers):
+            threading.Thread(target=self._work, name=f"prefetch-{i}", daemon=True).start()
+
+    def prefetch_results(self, records):
+        """Queue the first top_n records of a new result list"""
+        self.cancel()
+        for rank, record in enumerate(records[:self.top_n]):
+            self._submit(record['video_id'], (RESULT_PRIORITY, rank))
+
+    def hover(self, video_id):
+        self._submit(video_id, (HOVER_PRIORITY, 0))
+
+    def cancel(self):
+        with self._lock:
+            self._generation += 1
+            self._queued.clear()
+            # Forget timings of prefetches that have since left the cache
+            self._durations = {
+                video_id: seconds for video_id, seconds in self._durations.items()
+                if video_id in self.cache}
+
+    def claim(self, video_id, timeout=30):
+        """Called by load_video before resolving; returns seconds saved or None
+
+        Waits for a prefetch of the same video that is already running rather
+        than starting a second extraction.
+        """
+        start = time.perf_counter()
+        with self._lock:
+            event = self._in_flight.get(video_id)
+        if event is not None:
+            event.wait(timeout)
+        waited = time.perf_counter() - start
+
+        with self._lock:
+            duration = self._durations.pop(video_id, None)
+            if duration is None or video_id not in self.cache:
+                self.counters['misses'] += 1
+                return None
+            saved = max(duration - waited, 0.0)
+            self.counters['hits'] += 1
+            self.counters['saved_ms'] += saved * 1000
+            return saved
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+        claims = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / claims if claims else 0.0
+        return stats
+
+    def _submit(self, video_id, priority):
+        with self._lock:
+            if video_id in self._in_flight or video_id in self.cache:
+                return
+            if video_id in self._queued and priority[0] != HOVER_PRIORITY:
+                return  # a hover re-queues it ahead; the later copy is skipped
+            self._queued.add(video_id)
+            generation = self._generation
+        self._queue.put((priority, next(self._order), generation, video_id))
+
+    def _work(self):
+        while True:
+            _, _, generation, video_id = self._queue.get()
+            with self._lock:
+                if generation != self._generation or video_id not in self._queued:
+                    continue  # cancelled by a newer search
+                self._queued.discard(video_id)
+                if video_id in self.cache:
+                    continue  # cached by load_video since it was queued
+                event = self._in_flight[video_id] = threading.Event()
+
+            start = time.perf_counter()
+            try:
+                resolve(video_id, self.cache, self.pool, background=True)
+            except Exception as e:
+                print(f"Prefetch of {video_id} failed: {str(e)}")
+                with self._lock:
+                    self.counters['failed'] += 1
+            else:
+                with self._lock:
+                    self._durations[video_id] = time.perf_counter() - start
+                    self.counters['prefetched'] += 1
+            finally:
+                with self._lock:
+                    del self._in_flight[video_id]
+                event.set()
@@ -0,0 +1,105 @@
+# profiles.py
+import os
+import json
+import threading
+from statistics import median
+
+# VLC options per playback profile. Instance options need a new
+# vlc.Instance, media options are added to every media that is opened.
+PROFILES = {
+    "Default": {
+        'instance': [],
+        'media': [],
+    },
+    "Low latency": {
+        # Small buffers: playback starts and seeks sooner, but stalls more easily
+        'instance': ['--network-caching=300', '--file-caching=300', '--clock-jitter=0'],
+        'media': [':network-caching=300'],
+    },
+    "Low CPU": {
+        # Hardware decoding, skip the deblocking filter and late frames
+        'instance': ['--avcodec-hw=any', '--avcodec-skiploopfilter=4',
+                     '--avcodec-fast', '--drop-late-frames', '--skip-frames'],
+        'media': [':avcodec-hw=any'],
+    },
+    "High buffer": {
+        # Large buffers for slow or unstable connections
+        'instance': ['--network-caching=5000', '--file-caching=3000'],
+        'media': [':network-caching=5000'],
+    },
+}
+DEFAULT_PROFILE = "Default"
+
+
+def instance_options(profile):
+    return list(PROFILES.get(profile, PROFILES[DEFAULT_PROFILE])['instance'])
+
+
+def media_options(profile):
+    return list(PROFILES.get(profile, PROFILES[DEFAULT_PROFILE])['media'])
+
+
+class ProfileStats:
+    """Time-to-first-frame and rebuffering per playback profile
+
+    Kept in a small JSON file so profiles can be compared across sessions.
+    Only the last `max_samples` first-frame times of each profile are kept.
+    """
+
+    def __init__(self, path=None, max_samples=200):
+        self.path = path
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._stats = self._load()
+
+    def first_frame(self, profile, seconds):
+        with self._lock:
+            samples = self._entry(profile)['ttff']
+            samples.append(round(seconds, 3))
+            del samples[:-self.max_samples]
+            self._save()
+
+    def video_finished(self, profile, stalls, played_seconds):
+        if played_seconds <= 0:
+            return
+        with self._lock:
+            entry = self._entry(profile)
+            entry['videos'] += 1
+            entry['stalls'] += stalls
+            entry['played'] += played_seconds
+            self._save()
+
+    def summary(self):
+        """{profile: {'ttff_median', 'videos', 'stalls_per_hour'}} for profiles with data"""
+        with self._lock:
+            summary = {}
+            for profile, entry in self._stats.items():
+                summary[profile] = {
+                    'ttff_median': median(entry['ttff']) if entry['ttff'] else None,
+                    'videos': entry['videos'],
+                    'stalls_per_hour': entry['stalls'] / entry['played'] * 3600 if entry['played'] else None,
+                }
+            return summary
+
+    def _entry(self, profile):
+        # Caller holds the lock
+        return self._stats.setdefault(profile, {'ttff': [], 'videos': 0, 'stalls': 0, 'played': 0.0})
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path + ".tmp", 'w') as f:
+                json.dump(self._stats, f)
+            os.replace(self.path + ".tmp", self.path)
+        except OSError as e:
+            print(f"Error saving profile stats: {str(e)}")
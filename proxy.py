@@ -0,0 +1,326 @@
+# proxy.py
+import os
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import net
+
+RANGE_HEADER = re.compile(r'bytes=(\d*)-(\d*)')
+CONTENT_RANGE_TOTAL = re.compile(r'/(\d+)$')
+# Byte ranges have to address the file itself, not a compressed encoding of it
+HEADERS = {'Accept-Encoding': 'identity'}
+
+
+class UpstreamError(Exception):
+    pass
+
+
+class StreamProxy:
+    """Local HTTP server that VLC reads instead of the remote stream URL
+
+    The remote file is fetched as fixed-size chunks with byte-range
+    requests. While a chunk is served, the next `read_ahead` chunks are
+    requested in parallel on a small thread pool, so the playhead reads
+    from memory instead of waiting on a single slow connection. Chunks are
+    kept in an LRU bounded by `memory_bytes`; evicted chunks spill to
+    `disk_dir` (bounded by `disk_bytes`) when one is given. A seek only
+    fetches the chunks it lands in that are not cached yet.
+    """
+
+    def __init__(self, chunk_size=1024 * 1024, read_ahead=4, workers=4,
+                 memory_bytes=64 * 1024 * 1024, disk_dir=None, disk_bytes=512 * 1024 * 1024,
+                 session=None):
+        self.chunk_size = chunk_size
+        self.read_ahead = read_ahead
+        self.memory_bytes = memory_bytes
+        self.disk_dir = disk_dir
+        self.disk_bytes = disk_bytes
+        self.session = session or net.session()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="proxy-fetch")
+        self._lock = threading.Lock()
+        self._urls = OrderedDict()  # token -> upstream url
+        self._sizes = {}  # token -> total size in bytes
+        self._memory = OrderedDict()  # (token, index) -> bytes
+        self._memory_used = 0
+        self._disk = OrderedDict()  # (token, index) -> size of the spilled file
+        self._disk_used = 0
+        self._pending = {}  # (token, index) -> Future
+        self._recent = deque(maxlen=32)  # (start, end, bytes) of finished upstream fetches
+        self.counters = {
+            'upstream_requests': 0, 'upstream_bytes': 0, 'served_bytes': 0,
+            'memory_hits': 0, 'disk_hits': 0, 'misses': 0,
+        }
+        self._server = None
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), ProxyRequestHandler)
+        self._server.daemon_threads = True
+        self._server.proxy = self
+        threading.Thread(target=self._server.serve_forever, name="proxy", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def register(self, url):
+        """Local URL that serves `url` through the proxy"""
+        token = self._token(url)
+        with self._lock:
+            self._urls[token] = url
+            self._urls.move_to_end(token)
+            while len(self._urls) > 50:
+                self._urls.popitem(last=False)  # its chunks age out of the LRU
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/stream/{token}"
+
+    def preload(self, url):
+        """Start fetching the beginning of `url` before VLC asks for it
+
+        Used for the next video in the queue; the chunks stay in the LRU
+        under the same token register() gives that URL later.
+        """
+        self.register(url)
+        token = self._token(url)
+        # Chunk 0 reports the size, read-ahead then queues the following chunks
+        self._schedule(token, 0).add_done_callback(lambda _: self._read_ahead(token, 0))
+
+    def throughput(self):
+        """Recent upstream throughput in bytes/s across parallel fetches, or None"""
+        with self._lock:
+            recent = list(self._recent)
+        if not recent:
+            return None
+        span = max(end for _, end, _ in recent) - min(start for start, _, _ in recent)
+        return sum(size for _, _, size in recent) / span if span > 0 else None
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['memory_bytes'] = self._memory_used
+            stats['disk_bytes'] = self._disk_used
+        stats['throughput'] = self.throughput()
+        return stats
+
+    # Chunk access, used by the request handler
+
+    def size(self, token):
+        if token not in self._sizes:
+            self.chunk(token, 0)
+        return self._sizes.get(token)
+
+    def chunk(self, token, index):
+        """Bytes of chunk `index`, fetching it if needed, and queue read-ahead"""
+        data = self._cached(token, index)
+        if data is None:
+            with self._lock:
+                self.counters['misses'] += 1
+            data = self._schedule(token, index).result()
+        self._read_ahead(token, index)
+        return data
+
+    def record_served(self, size):
+        with self._lock:
+            self.counters['served_bytes'] += size
+
+    @staticmethod
+    def _token(url):
+        return hashlib.sha1(url.encode()).hexdigest()[:16]
+
+    def _cached(self, token, index):
+        key = (token, index)
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.counters['memory_hits'] += 1
+                return data
+            if key not in self._disk:
+                return None
+        try:
+            with open(self._disk_path(key), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        with self._lock:
+            self.counters['disk_hits'] += 1
+            self._remember(key, data)
+        return data
+
+    def _read_ahead(self, token, index):
+        total = self._sizes.get(token)
+        if total is None:
+            return
+        last = (total - 1) // self.chunk_size
+        for ahead in range(index + 1, min(index + self.read_ahead, last) + 1):
+            key = (token, ahead)
+            with self._lock:
+                if key in self._memory or key in self._disk or key in self._pending:
+                    continue
+            self._schedule(token, ahead)
+
+    def _schedule(self, token, index):
+        key = (token, index)
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._pending[key] = self._executor.submit(self._fetch, token, index)
+        return future
+
+    def _fetch(self, token, index):
+        key = (token, index)
+        try:
+            with self._lock:
+                url = self._urls.get(token)
+            if url is None:
+                raise UpstreamError("Unknown stream")
+            start = index * self.chunk_size
+            end = start + self.chunk_size - 1
+            started = time.perf_counter()
+            headers = dict(HEADERS, Range=f"bytes={start}-{end}")
+            with self.session.get(url, headers=headers, stream=True, timeout=15) as response:
+                if response.status_code == 206:
+                    match = CONTENT_RANGE_TOTAL.search(response.headers.get('Content-Range', ''))
+                    total = int(match.group(1)) if match else None
+                elif response.status_code == 200 and start == 0:
+                    total = int(response.headers.get('Content-Length', 0)) or None
+                else:
+                    raise UpstreamError(f"Upstream returned {response.status_code}")
+                # A chunk is complete when it fills the range or reaches the end of the file
+                expected = self.chunk_size if total is None else min(self.chunk_size, total - start)
+                # iter_content turns urllib3 read errors into RequestExceptions,
+                # which raw.read() would not, and may stop short of `expected`
+                data = bytearray()
+                for piece in response.iter_content(64 * 1024):
+                    data += piece
+                    if len(data) >= expected:
+                        break
+                data = bytes(data[:expected])
+            finished = time.perf_counter()
+            if len(data) != expected:
+                raise UpstreamError(f"Upstream sent {len(data)} of {expected} bytes")
+
+            with self._lock:
+                if total is not None:
+                    self._sizes[token] = total
+                self._recent.append((started, finished, len(data)))
+                self.counters['upstream_requests'] += 1
+                self.counters['upstream_bytes'] += len(data)
+                self._remember(key, data)
+            return data
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def _remember(self, key, data):
+        # Caller holds the lock
+        if key in self._memory:
+            return
+        self._memory[key] = data
+        self._memory_used += len(data)
+        while self._memory_used > self.memory_bytes and len(self._memory) > 1:
+            old_key, old_data = self._memory.popitem(last=False)
+            self._memory_used -= len(old_data)
+            self._spill(old_key, old_data)
+
+    def _spill(self, key, data):
+        if not self.disk_dir or key in self._disk:
+            return
+        try:
+            with open(self._disk_path(key), 'wb') as f:
+                f.write(data)
+        except OSError:
+            return
+        self._disk[key] = len(data)
+        self._disk_used += len(data)
+        while self._disk_used > self.disk_bytes and self._disk:
+            old_key, size = self._disk.popitem(last=False)
+            self._disk_used -= size
+            try:
+                os.remove(self._disk_path(old_key))
+            except OSError:
+                pass
+
+    def _disk_path(self, key):
+        token, index = key
+        return os.path.join(self.disk_dir, f"{token}_{index}.chunk")
+
+
+class ProxyRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_HEAD(self):
+        self.handle_stream(send_body=False)
+
+    def do_GET(self):
+        self.handle_stream(send_body=True)
+
+    def handle_stream(self, send_body):
+        token = self.path.rsplit('/', 1)[-1]
+        proxy = self.server.proxy
+        try:
+            total = proxy.size(token)
+        except Exception as e:
+            self.send_error(502, str(e))
+            return
+        if total is None:
+            self.send_error(502, "Upstream did not report a size")
+            return
+
+        start, end = 0, total - 1
+        match = RANGE_HEADER.match(self.headers.get('Range', ''))
+        if match and (match.group(1) or match.group(2)):
+            if match.group(1):
+                start = int(match.group(1))
+                if match.group(2):
+                    end = min(int(match.group(2)), total - 1)
+            else:
+                start = max(0, total - int(match.group(2)))  # suffix range
+            if start >= total:
+                self.send_response(416)
+                self.send_header('Content-Range', f"bytes */{total}")
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{end}/{total}")
+        else:
+            self.send_response(200)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.end_headers()
+        if not send_body:
+            return
+
+        position = start
+        try:
+            while position <= end:
+                index = position // proxy.chunk_size
+                data = proxy.chunk(token, index)
+                offset = position - index * proxy.chunk_size
+                piece = data[offset:offset + end - position + 1]
+                if not piece:
+                    break
+                self.wfile.write(piece)
+                position += len(piece)
+                proxy.record_served(len(piece))
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # VLC closed the connection, usually to seek elsewhere
+        except Exception as e:
+            print(f"Proxy error: {str(e)}")
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
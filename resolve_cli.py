@@ -0,0 +1,196 @@
+# resolve_cli.py
+"""Resolve search queries or video ids to stream URLs without the GUI
+
+Usage: python resolve_cli.py [options] INPUT ... [-i FILE]
+
+Each input is a watch URL or a search query. With --ids, an input that
+looks like a bare 11-character video id is taken as one; it is off by
+default because ordinary words such as "photography" look the same. A
+query expands to its first --per-query results (the result page also
+goes into the search cache the player reads, unless --no-cache). Videos
+are resolved in parallel on a process pool, started at most --rate per
+second and retried with exponential backoff. One JSON object per video
+is written to stdout as soon as it is ready, a summary goes to stderr.
+`url` is the media to open; `audio_url` is a separate audio track when
+the selected video format has none.
+"""
+import re
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlparse, parse_qs
+
+from settings import Settings
+from search import fetch_results
+from cache import SearchCache
+from resolver import extract_info, url_expiry
+from formats import FormatIndex
+import net
+
+VIDEO_ID = re.compile(r'^[A-Za-z0-9_-]{11}$')
+# Retrying these only repeats the same answer
+PERMANENT_ERRORS = ('Video unavailable', 'Private video', 'removed', 'Sign in to confirm your age')
+
+
+def video_id_from(text, bare_ids=False):
+    """Video id of a youtube.com / youtu.be URL (or of a bare id if allowed), else None"""
+    text = text.strip()
+    if bare_ids and VIDEO_ID.match(text):
+        return text
+    parsed = urlparse(text)
+    if parsed.netloc.endswith('youtu.be'):
+        candidate = parsed.path.strip('/')
+    elif parsed.netloc.endswith('youtube.com'):
+        candidate = parse_qs(parsed.query).get('v', [''])[0]
+        if not candidate and parsed.path.startswith(('/shorts/', '/embed/', '/live/')):
+            candidate = parsed.path.split('/')[2]
+    else:
+        return None
+    return candidate if VIDEO_ID.match(candidate) else None
+
+
+def resolve_video(video_id, quality, audio_only, retries, backoff):
+    """Extract and select streams for one video; runs in a worker process"""
+    start = time.perf_counter()
+    result = {'video_id': video_id}
+    for attempt in range(1, retries + 2):
+        try:
+            index = FormatIndex(extract_info(video_id))
+            break
+        except Exception as e:
+            error = str(e)
+            if attempt > retries or any(marker in error for marker in PERMANENT_ERRORS):
+                result.update(error=error, attempts=attempt,
+                              elapsed=round(time.perf_counter() - start, 3))
+                return result
+            time.sleep(backoff * 2 ** (attempt - 1))
+
+    url, audio_url = index.choose(quality, audio_only=audio_only)
+    if audio_only:
+        formats = [index.audio] if index.audio else []
+    else:
+        formats = [f for f in index.select(quality) or () if f is not None]
+    result.update(
+        title=index.info.get('title'),
+        duration=index.info.get('duration'),
+        qualities=index.qualities(),
+        formats=[FormatIndex.describe(f) for f in formats],
+        format_ids=[f['format_id'] for f in formats],
+        url=url,
+        audio_url=audio_url,
+        expires=url_expiry(url),
+        attempts=attempt,
+        elapsed=round(time.perf_counter() - start, 3),
+    )
+    return result
+
+
+class RateLimiter:
+    """Spaces out calls to wait() to at most `rate` per second"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = time.monotonic()
+
+    def wait(self):
+        now = time.monotonic()
+        if now < self._next:
+            time.sleep(self._next - now)
+            now = self._next
+        self._next = now + self.interval
+
+
+def expand_inputs(inputs, per_query, cache, limiter, bare_ids=False):
+    """Yield a record with at least 'video_id' for every video to resolve, without duplicates"""
+    seen = set()
+    for text in inputs:
+        video_id = video_id_from(text, bare_ids)
+        if video_id:
+            records = [{'video_id': video_id}]
+        else:
+            page = cache.get(text) if cache else None
+            if page is None:
+                limiter.wait()
+                try:
+                    page = fetch_results(text)
+                except Exception as e:
+                    print(json.dumps({'query': text, 'error': str(e)}), flush=True)
+                    continue
+                if cache:
+                    cache.put(text, page)
+            records = [dict(record, query=text, rank=rank)
+                       for rank, record in enumerate(page['records'][:per_query])]
+        for record in records:
+            if record['video_id'] not in seen:
+                seen.add(record['video_id'])
+                yield record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve YouTube videos to stream URLs as JSONL")
+    parser.add_argument("inputs", nargs="*", help="watch URLs, search queries or (with --ids) video ids")
+    parser.add_argument("--ids", action="store_true",
+                        help="take 11-character inputs as video ids instead of searching for them")
+    parser.add_argument("-i", "--input-file", help="file with one input per line ('-' for stdin)")
+    parser.add_argument("--per-query", type=int, default=5, help="results resolved per search query")
+    parser.add_argument("--quality", default="Auto", help='"Auto" or e.g. "720p"')
+    parser.add_argument("--audio-only", action="store_true")
+    parser.add_argument("--workers", type=int, default=4, help="worker processes")
+    parser.add_argument("--rate", type=float, default=2.0, help="requests started per second")
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--backoff", type=float, default=1.0, help="first retry delay in seconds")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or fill the search cache")
+    args = parser.parse_args()
+
+    inputs = list(args.inputs)
+    if args.input_file:
+        with (sys.stdin if args.input_file == "-" else open(args.input_file, encoding="utf-8")) as f:
+            inputs.extend(line.strip() for line in f if line.strip())
+    if not inputs:
+        parser.error("no inputs given")
+
+    cache = None if args.no_cache else SearchCache(
+        Settings.SEARCH_CACHE_SIZE, Settings.SEARCH_CACHE_TTL, Settings.CACHE_DB)
+    limiter = RateLimiter(args.rate)
+    counts = {'resolved': 0, 'failed': 0}
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        running = {}
+
+        def report(future):
+            result = dict(running.pop(future), **future.result())
+            counts['failed' if 'error' in result else 'resolved'] += 1
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+
+        for record in expand_inputs(inputs, args.per_query, cache, limiter, args.ids):
+            # Submit only as many as there are workers, so the rate limit
+            # applies to when extractions start, not when they are queued
+            while len(running) >= args.workers:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    report(future)
+            limiter.wait()
+            future = pool.submit(resolve_video, record['video_id'], args.quality,
+                                 args.audio_only, args.retries, args.backoff)
+            running[future] = record
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                report(future)
+
+    if cache:
+        cache.close()
+    elapsed = time.perf_counter() - start
+    total = counts['resolved'] + counts['failed']
+    print(f"{counts['resolved']} resolved, {counts['failed']} failed in {elapsed:.1f} s"
+          f" ({total / elapsed if elapsed else 0:.2f} videos/s)", file=sys.stderr)
+    print("Search requests: {requests} over {connections} connections ({reuse_rate:.0%} reused)".format(
+        **net.stats()), file=sys.stderr)
+    sys.exit(1 if counts['failed'] else 0)
+
+
+if __name__ == "__main__":
+    main()
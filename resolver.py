@@ -0,0 +1,176 @@
+# resolver.py
+import re
+import time
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse, parse_qs
+
+from formats import FormatIndex
+
+WATCH_URL = "https://www.youtube.com/watch?v={}"
+FORMAT_KEYS = (
+    'format_id', 'url', 'ext', 'protocol', 'width', 'height', 'fps',
+    'vcodec', 'acodec', 'tbr', 'vbr', 'abr', 'filesize', 'filesize_approx',
+)
+# Storyboards: sprite sheets of small frames, one fragment per sheet
+STORYBOARD_KEYS = ('format_id', 'width', 'height', 'rows', 'columns', 'fps')
+EXPIRE_IN_PATH = re.compile(r'/expire/(\d+)')
+YDL_OPTS = {
+    'format': 'best/bestvideo+bestaudio',
+    'quiet': True,
+    'no_warnings': True,
+    'extract_flat': False
+}
+
+
+def compact_info(info):
+    """Keep only the fields playback needs from a yt-dlp info dict"""
+    return {
+        'id': info.get('id'),
+        'title': info.get('title'),
+        'duration': info.get('duration'),
+        'url': info.get('url'),
+        'formats': [
+            {key: f.get(key) for key in FORMAT_KEYS}
+            for f in info.get('formats') or []
+            if f.get('url')
+        ],
+        'storyboards': [
+            dict({key: f.get(key) for key in STORYBOARD_KEYS}, fragments=[
+                {'url': fragment['url'], 'duration': fragment.get('duration')}
+                for fragment in f['fragments']
+            ])
+            for f in info.get('formats') or []
+            if f.get('protocol') == 'mhtml' and f.get('fragments')
+        ],
+    }
+
+
+_ydl = None
+_ydl_lock = threading.Lock()
+
+
+def extract_info(video_id):
+    """Extract in this process; the player uses extract_pool.ExtractionPool instead
+
+    One YoutubeDL is kept per process, so its extractor setup and HTTP
+    connections carry over to the next video.
+    """
+    global _ydl
+    # yt-dlp takes a noticeable part of a second to import, so it is only
+    # loaded when needed
+    import yt_dlp
+
+    with _ydl_lock:
+        if _ydl is None:
+            _ydl = yt_dlp.YoutubeDL(YDL_OPTS)
+        info = _ydl.extract_info(WATCH_URL.format(video_id), download=False)
+    return compact_info(info)
+
+
+def url_expiry(url):
+    """Unix time at which a googlevideo URL stops working, if it says"""
+    if not url:
+        return None
+    parsed = urlparse(url)
+    values = parse_qs(parsed.query).get('expire')
+    if values:
+        try:
+            return float(values[0])
+        except ValueError:
+            return None
+    match = EXPIRE_IN_PATH.search(parsed.path)
+    return float(match.group(1)) if match else None
+
+
+def info_expiry(info):
+    """Earliest expiry among the stream URLs in an info dict"""
+    urls = [f['url'] for f in info['formats']] + [info.get('url')]
+    expiries = [e for e in map(url_expiry, urls) if e is not None]
+    return min(expiries) if expiries else None
+
+
+class StreamCache:
+    """Resolved format indexes per video id
+
+    Entries are dropped `margin` seconds before the earliest `expire`
+    timestamp embedded in their stream URLs (or after `ttl` when the URLs
+    carry none), and the cache holds at most `max_entries` videos.
+    """
+
+    def __init__(self, max_entries=50, margin=5 * 60, ttl=60 * 60):
+        self.max_entries = max_entries
+        self.margin = margin
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'expired': 0, 'invalidated': 0}
+
+    def get(self, video_id):
+        with self._lock:
+            entry = self._entries.get(video_id)
+            if entry is None:
+                self.counters['misses'] += 1
+                return None
+            expires, index = entry
+            if time.time() >= expires:
+                del self._entries[video_id]
+                self.counters['expired'] += 1
+                self.counters['misses'] += 1
+                return None
+            self._entries.move_to_end(video_id)
+            self.counters['hits'] += 1
+            return index
+
+    def __contains__(self, video_id):
+        """Fresh entry present; unlike get() this does not count as a lookup"""
+        return self.peek(video_id) is not None
+
+    def peek(self, video_id):
+        """Fresh index or None, without counting a hit or miss or touching LRU order"""
+        with self._lock:
+            entry = self._entries.get(video_id)
+            if entry is None or time.time() >= entry[0]:
+                return None
+            return entry[1]
+
+    def put(self, video_id, index):
+        expiry = info_expiry(index.info)
+        expires = expiry - self.margin if expiry else time.time() + self.ttl
+        with self._lock:
+            self._entries[video_id] = (expires, index)
+            self._entries.move_to_end(video_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, video_id):
+        with self._lock:
+            if self._entries.pop(video_id, None) is not None:
+                self.counters['invalidated'] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['entries'] = len(self._entries)
+        return stats
+
+
+def resolve(video_id, cache=None, pool=None, background=False):
+    """FormatIndex for video_id, from cache when still fresh
+
+    Blocks until extraction finishes, in the worker pool when one is given.
+    A `background` resolve is speculative: it extracts as a low-priority
+    job and its cache lookup is not counted in the hit/miss statistics.
+    """
+    index = None
+    if cache is not None:
+        index = cache.peek(video_id) if background else cache.get(video_id)
+    if index is None:
+        if pool is not None:
+            info = pool.submit(video_id, background).result()
+        else:
+            info = extract_info(video_id)
+        index = FormatIndex(info)
+        if cache is not None:
+            cache.put(video_id, index)
+    return index
@@ -0,0 +1,177 @@
+# search.py
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote_plus
+
+import net
+from extractor import InitialDataExtractor
+
+SEARCH_URL = "https://www.youtube.com/results?search_query={}"
+CONTINUATION_URL = "https://www.youtube.com/youtubei/v1/search?prettyPrint=false"
+CLIENT_VERSION = "2.20240101.00.00"
+CHUNK_SIZE = 64 * 1024
+
+
+class SearchCancelled(Exception):
+    pass
+
+
+def video_record(video):
+    """Turn a videoRenderer dict into a compact result record"""
+    runs = video.get('title', {}).get('runs') or [{}]
+    owner = video.get('ownerText', {}).get('runs') or [{}]
+    return {
+        'video_id': video['videoId'],
+        'title': runs[0].get('text', ''),
+        'duration': video.get('lengthText', {}).get('simpleText', ''),
+        'channel': owner[0].get('text', ''),
+    }
+
+
+def fetch_results(query, is_cancelled=lambda: False, timings=None):
+    """Stream the results page and return the first page of results
+
+    The page is a dict with the video `records` and the `continuation`
+    token for the next page (or None). Reading stops as soon as the
+    ytInitialData payload is complete, so the rest of the page is never
+    downloaded.
+    """
+    timings = timings if timings is not None else {}
+    url = SEARCH_URL.format(quote_plus(query))
+    extractor = InitialDataExtractor()
+    records = []
+    parse_time = 0.0
+    start = time.perf_counter()
+    with net.session().get(url, stream=True, timeout=15) as response:
+        if response.status_code != 200:
+            raise Exception("Failed to fetch search results")
+        for chunk in response.iter_content(CHUNK_SIZE):
+            if is_cancelled():
+                raise SearchCancelled()
+            parse_start = time.perf_counter()
+            records.extend(video_record(video) for video in extractor.feed(chunk))
+            parse_time += time.perf_counter() - parse_start
+            if extractor.done:
+                break
+    extractor.close()
+    timings['fetch'] = time.perf_counter() - start - parse_time
+    timings['parse'] = parse_time
+    return {'records': records, 'continuation': extractor.continuation_token()}
+
+
+def parse_continuation(data):
+    """Records and next token from a youtubei search continuation response"""
+    records = []
+    continuation = None
+    for command in data.get('onResponseReceivedCommands', []):
+        action = command.get('appendContinuationItemsAction', {})
+        for item in action.get('continuationItems', []):
+            for content in item.get('itemSectionRenderer', {}).get('contents', []):
+                if 'videoRenderer' in content:
+                    records.append(video_record(content['videoRenderer']))
+            if 'continuationItemRenderer' in item:
+                continuation = item['continuationItemRenderer'][
+                    'continuationEndpoint']['continuationCommand']['token']
+    return {'records': records, 'continuation': continuation}
+
+
+def fetch_continuation(token, is_cancelled=lambda: False, timings=None):
+    """Fetch the results page that follows a continuation token"""
+    timings = timings if timings is not None else {}
+    body = {
+        'context': {'client': {'clientName': 'WEB', 'clientVersion': CLIENT_VERSION}},
+        'continuation': token,
+    }
+    start = time.perf_counter()
+    response = net.session().post(CONTINUATION_URL, json=body, timeout=15)
+    timings['fetch'] = time.perf_counter() - start
+    if response.status_code != 200:
+        raise Exception("Failed to fetch more results")
+    if is_cancelled():
+        raise SearchCancelled()
+    start = time.perf_counter()
+    page = parse_continuation(response.json())
+    timings['parse'] = time.perf_counter() - start
+    return page
+
+
+class SearchExecutor:
+    """Runs searches on a background thread and hands results back to the Tk loop
+
+    Every submit() supersedes the previous search: a superseded worker stops
+    reading the response at the next chunk and its results are never delivered.
+    """
+
+    def __init__(self, window, cache=None, max_workers=2):
+        self.window = window
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="search")
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def submit(self, query, on_done, on_error):
+        """Start a search; on_done(page, timings) / on_error(exc) run on the Tk thread"""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        self._executor.submit(self._run, generation, query, on_done, on_error)
+        return generation
+
+    def submit_continuation(self, token, on_done, on_error):
+        """Load the next page of the current search; dropped if a new search starts"""
+        generation = self._generation
+        self._executor.submit(self._run_continuation, generation, token, on_done, on_error)
+
+    def cancel(self):
+        with self._lock:
+            self._generation += 1
+
+    def is_current(self, generation):
+        return generation == self._generation
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _run(self, generation, query, on_done, on_error):
+        is_cancelled = lambda: not self.is_current(generation)
+        timings = {}
+        try:
+            if self.cache is not None:
+                start = time.perf_counter()
+                page = self.cache.get(query)
+                timings['cache'] = time.perf_counter() - start
+                if page is not None:
+                    self._deliver(generation, on_done, page, timings)
+                    return
+
+            page = fetch_results(query, is_cancelled, timings)
+            if self.cache is not None and page['records']:
+                self.cache.put(query, page)
+        except SearchCancelled:
+            return
+        except Exception as e:
+            self._deliver(generation, on_error, e)
+            return
+        self._deliver(generation, on_done, page, timings)
+
+    def _run_continuation(self, generation, token, on_done, on_error):
+        is_cancelled = lambda: not self.is_current(generation)
+        timings = {}
+        try:
+            page = fetch_continuation(token, is_cancelled, timings)
+        except SearchCancelled:
+            return
+        except Exception as e:
+            self._deliver(generation, on_error, e)
+            return
+        self._deliver(generation, on_done, page, timings)
+
+    def _deliver(self, generation, callback, *args):
+        def apply():
+            # A newer search may have started while this one was queued
+            if self.is_current(generation):
+                callback(*args)
+        self.window.after(0, apply)
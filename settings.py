@@ -9,4 +9,33 @@ class Settings:
     THEME = "System"
     DEFAULT_QUALITY = "Auto"
     DEFAULT_VOLUME = 100  # Добавлено для управления громкостью
-    AUTOPLAY = False
\ No newline at end of file
+    AUTOPLAY = False
+    AUDIO_ONLY = False  # Только звук, без декодирования видео
+    PLAYBACK_PROFILE = "Default"  # Набор опций VLC, см. profiles.py
+    PROFILE_STATS_FILE = "profile_stats.json"
+    QUEUE_FILE = "queue.json"  # Сохранённая очередь воспроизведения
+    METRICS_ENABLED = False  # Замеры задержек для окна диагностики
+    TRACE_FILE = "trace.jsonl"
+    SEARCH_CACHE_SIZE = 100  # Запросов в памяти
+    SEARCH_CACHE_TTL = 6 * 60 * 60  # Секунд
+    SEARCH_CACHE_PERSIST = True
+    CACHE_DB = "cache.db"
+    LIBRARY_DB = "library.db"  # Найденные и просмотренные видео для локального поиска
+    LIBRARY_SIZE = 5000  # Видео, старые непросмотренные удаляются первыми
+    LIBRARY_SUGGESTIONS = 8  # Локальных совпадений перед результатами из сети
+    STREAM_CACHE_SIZE = 50  # Видео с извлечёнными форматами
+    PREFETCH_COUNT = 5  # Первые результаты, разрешаемые заранее
+    PREFETCH_WORKERS = 2
+    EXTRACTION_WORKERS = 2  # Процессов yt-dlp
+    THUMBNAIL_CACHE_DIR = "thumbnails"
+    THUMBNAIL_MEMORY_BUDGET = 8 * 1024 * 1024  # Байт на готовые миниатюры
+    STORYBOARD_MEMORY_BUDGET = 16 * 1024 * 1024  # Байт на раскодированные листы storyboard
+    MEDIA_CACHE_ENABLED = False
+    MEDIA_CACHE_DIR = "media"
+    MEDIA_CACHE_BUDGET = 2 * 1024 * 1024 * 1024  # Байт на диске
+    HEALTH_AUTO_QUALITY = True  # Снижать качество при устойчивых потерях кадров и паузах
+    HEALTH_DROP_LIMIT = 0.05  # Доля потерянных кадров за интервал
+    HEALTH_STALL_LIMIT = 0.1  # Доля интервала в буферизации
+    STREAM_PROXY = True  # Воспроизведение через локальный прокси с упреждающей загрузкой
+    PROXY_READ_AHEAD = 4  # Фрагментов по 1 МБ
+    PROXY_MEMORY_BUDGET = 64 * 1024 * 1024
\ No newline at end of file
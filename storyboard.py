@@ -0,0 +1,149 @@
+# storyboard.py
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import customtkinter as ctk
+
+import net
+
+PREVIEW_WIDTH = 160  # Ширина кадра предпросмотра; берётся ближайший storyboard
+
+
+def pick_storyboard(storyboards, width=PREVIEW_WIDTH):
+    """Storyboard format whose tile width is closest to width, or None"""
+    usable = [sb for sb in storyboards or []
+              if sb.get('width') and sb.get('height') and sb.get('rows') and sb.get('columns')]
+    if not usable:
+        return None
+    return min(usable, key=lambda sb: abs(sb['width'] - width))
+
+
+def tile_position(storyboard, seconds):
+    """(sheet index, row, column) of the tile covering `seconds`"""
+    per_sheet = storyboard['rows'] * storyboard['columns']
+    fps = storyboard.get('fps')
+    if not fps:
+        fps = per_sheet / (storyboard['fragments'][0].get('duration') or 1)
+    tile = max(0, int(seconds * fps))
+    sheet = min(tile // per_sheet, len(storyboard['fragments']) - 1)
+    tile = min(tile - sheet * per_sheet, per_sheet - 1)
+    return sheet, tile // storyboard['columns'], tile % storyboard['columns']
+
+
+class StoryboardPreviews:
+    """Seek-preview frames cut from yt-dlp storyboard sprite sheets
+
+    A storyboard is a series of JPEG sheets, each a grid of small frames
+    covering a stretch of the video. A sheet is downloaded and decoded
+    once, on a background thread, and kept in an LRU bounded by
+    `budget_bytes` of decoded pixels; single frames are cropped from it
+    only when the pointer reaches them, and the last `max_tiles` of those
+    are kept as CTkImages. While the pointer moves, only the most recent
+    request is answered.
+    """
+
+    def __init__(self, window, budget_bytes=16 * 1024 * 1024, max_tiles=64):
+        self.window = window
+        self.budget_bytes = budget_bytes
+        self.max_tiles = max_tiles
+        self.video_id = None
+        self.storyboard = None
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storyboard")
+        self._session = net.session()
+        self._lock = threading.Lock()
+        self._sheets = OrderedDict()  # (video_id, format_id, sheet) -> decoded PIL image
+        self._used_bytes = 0
+        self._tiles = OrderedDict()  # (video_id, format_id, sheet, row, column) -> CTkImage
+        self._loading = set()
+        self._wanted = None  # (sheet key, row, column, callback) of the latest request
+
+    def set_storyboard(self, video_id, storyboards):
+        """Switch to the storyboards of the video now playing (None or [] disables previews)"""
+        self.video_id = video_id
+        self.storyboard = pick_storyboard(storyboards)
+        self._wanted = None
+
+    def request(self, seconds, callback):
+        """Call callback(image) on the Tk thread with the frame nearest `seconds`
+
+        Returns False when the current video has no storyboard.
+        """
+        storyboard = self.storyboard
+        if storyboard is None:
+            return False
+        sheet, row, column = tile_position(storyboard, seconds)
+        key = (self.video_id, storyboard['format_id'], sheet)
+        image = self._tile(key, row, column)
+        if image is not None:
+            self._wanted = None
+            callback(image)
+            return True
+        self._wanted = (key, row, column, callback)
+        with self._lock:
+            if key in self._loading:
+                return True
+            self._loading.add(key)
+        self._pool.submit(self._fetch, key, storyboard['fragments'][sheet]['url'])
+        return True
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _tile(self, key, row, column):
+        # Tk thread: cached frame, or a fresh crop if its sheet is in memory
+        tile_key = key + (row, column)
+        image = self._tiles.get(tile_key)
+        if image is not None:
+            self._tiles.move_to_end(tile_key)
+            return image
+        with self._lock:
+            sheet = self._sheets.get(key)
+            if sheet is None:
+                return None
+            self._sheets.move_to_end(key)
+        width, height = self.storyboard['width'], self.storyboard['height']
+        left, top = column * width, row * height
+        frame = sheet.crop((left, top, min(left + width, sheet.width), min(top + height, sheet.height)))
+        image = ctk.CTkImage(frame, size=frame.size)
+        self._tiles[tile_key] = image
+        while len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+        return image
+
+    def _fetch(self, key, url):
+        # Pillow is only imported once the first preview is needed
+        from PIL import Image
+
+        try:
+            response = self._session.get(url, timeout=10)
+            response.raise_for_status()
+            sheet = Image.open(io.BytesIO(response.content))
+            sheet = sheet.convert('RGB')
+        except Exception as e:
+            print(f"Error loading storyboard sheet: {str(e)}")
+            with self._lock:
+                self._loading.discard(key)
+            return
+        cost = sheet.width * sheet.height * 3
+        with self._lock:
+            self._loading.discard(key)
+            self._sheets[key] = sheet
+            self._used_bytes += cost
+            while self._used_bytes > self.budget_bytes and len(self._sheets) > 1:
+                _, evicted = self._sheets.popitem(last=False)
+                self._used_bytes -= evicted.width * evicted.height * 3
+        self.window.after(0, lambda: self._deliver(key))
+
+    def _deliver(self, key):
+        # Only the latest request is answered; older ones were for frames
+        # the pointer has already left
+        wanted = self._wanted
+        if wanted is None or wanted[0] != key:
+            return
+        _, row, column, callback = wanted
+        image = self._tile(key, row, column)
+        if image is not None:
+            self._wanted = None
+            callback(image)
@@ -0,0 +1,166 @@
+# thumbnails.py
+import os
+import io
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import customtkinter as ctk
+
+import net
+
+THUMBNAIL_URL = "https://i.ytimg.com/vi/{}/mqdefault.jpg"
+THUMBNAIL_SIZE = (64, 36)
+
+
+def decode_thumbnail(data, size):
+    """Decode and downscale a JPEG; runs in a worker process
+
+    Returns raw RGB bytes so only a few KB cross the process boundary.
+    """
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(data))
+    image.draft('RGB', (size[0] * 2, size[1] * 2))  # let libjpeg skip most of the work
+    image = image.convert('RGB')
+    image.thumbnail(size)
+    return image.size, image.tobytes()
+
+
+class ThumbnailLoader:
+    """Fetches, decodes and caches result thumbnails off the Tk thread
+
+    Downloads run on a bounded thread pool and are stored as-is under
+    `cache_dir`; decoding and downscaling happen in a process pool.
+    Ready CTkImages live in an LRU bounded by `budget_bytes`. Only ids
+    passed to set_visible() are fetched, so scrolling past rows does not
+    queue up work for them.
+    """
+
+    def __init__(self, window, cache_dir, size=THUMBNAIL_SIZE,
+                 fetch_workers=4, decode_workers=1, budget_bytes=8 * 1024 * 1024,
+                 max_disk_files=2000):
+        self.window = window
+        self.cache_dir = cache_dir
+        self.size = size
+        self.budget_bytes = budget_bytes
+        self.decode_workers = decode_workers
+        self.max_disk_files = max_disk_files
+        self._placeholder = None
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._fetch_pool = ThreadPoolExecutor(
+            max_workers=fetch_workers, thread_name_prefix="thumbnails")
+        self._decode_pool = None  # started on first use, not at startup
+        self._session = net.session()
+        self._lock = threading.Lock()
+        self._images = OrderedDict()  # video_id -> (CTkImage, cost)
+        self._used_bytes = 0
+        self._callbacks = {}  # video_id -> callbacks waiting for the image
+        self._visible = set()
+        self._fetch_pool.submit(self._prune_disk)
+
+    def placeholder_image(self):
+        """Blank image shown until a row's thumbnail arrives"""
+        if self._placeholder is None:
+            from PIL import Image
+            self._placeholder = ctk.CTkImage(
+                Image.new('RGB', self.size, (40, 40, 40)), size=self.size)
+        return self._placeholder
+
+    def get(self, video_id):
+        entry = self._images.get(video_id)
+        if entry is None:
+            return None
+        self._images.move_to_end(video_id)
+        return entry[0]
+
+    def set_visible(self, video_ids):
+        with self._lock:
+            self._visible = set(video_ids)
+
+    def request(self, video_id, callback):
+        """Call callback(image) on the Tk thread once the thumbnail is ready"""
+        image = self.get(video_id)
+        if image is not None:
+            callback(image)
+            return
+        with self._lock:
+            waiting = self._callbacks.setdefault(video_id, [])
+            waiting.append(callback)
+            if len(waiting) > 1:
+                return  # already in flight
+        self._fetch_pool.submit(self._fetch, video_id)
+
+    def shutdown(self):
+        self._fetch_pool.shutdown(wait=False, cancel_futures=True)
+        if self._decode_pool is not None:
+            self._decode_pool.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch(self, video_id):
+        with self._lock:
+            if video_id not in self._visible:
+                # Scrolled out of view before its turn came
+                self._callbacks.pop(video_id, None)
+                return
+        try:
+            data = self._read(video_id)
+            if self.decode_workers:
+                with self._lock:
+                    if self._decode_pool is None:
+                        # spawn, as in extract_pool: no fork of a process running Tk/VLC threads
+                        self._decode_pool = ProcessPoolExecutor(
+                            max_workers=self.decode_workers,
+                            mp_context=multiprocessing.get_context("spawn"))
+                decoded = self._decode_pool.submit(decode_thumbnail, data, self.size).result()
+            else:
+                decoded = decode_thumbnail(data, self.size)
+        except Exception as e:
+            print(f"Error loading thumbnail {video_id}: {str(e)}")
+            with self._lock:
+                self._callbacks.pop(video_id, None)
+            return
+        self.window.after(0, lambda: self._finish(video_id, *decoded))
+
+    def _prune_disk(self):
+        """Drop the oldest files once the disk cache holds more than max_disk_files"""
+        try:
+            paths = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)]
+            if len(paths) <= self.max_disk_files:
+                return
+            paths.sort(key=os.path.getmtime)
+            for path in paths[:len(paths) - self.max_disk_files]:
+                os.remove(path)
+        except OSError as e:
+            print(f"Error pruning thumbnail cache: {str(e)}")
+
+    def _read(self, video_id):
+        path = os.path.join(self.cache_dir, f"{video_id}.jpg")
+        if os.path.exists(path):
+            os.utime(path)  # mtime doubles as last-used time for pruning
+            with open(path, 'rb') as f:
+                return f.read()
+        response = self._session.get(THUMBNAIL_URL.format(video_id), timeout=10)
+        response.raise_for_status()
+        with open(path + ".tmp", 'wb') as f:
+            f.write(response.content)
+        os.replace(path + ".tmp", path)
+        return response.content
+
+    def _finish(self, video_id, size, pixels):
+        # CTkImage has to be created on the Tk thread
+        from PIL import Image
+        image = ctk.CTkImage(Image.frombytes('RGB', size, pixels), size=size)
+        # PIL copy plus the PhotoImage Tk renders from it
+        cost = size[0] * size[1] * 7
+        self._images[video_id] = (image, cost)
+        self._used_bytes += cost
+        while self._used_bytes > self.budget_bytes and len(self._images) > 1:
+            _, (_, evicted_cost) = self._images.popitem(last=False)
+            self._used_bytes -= evicted_cost
+
+        with self._lock:
+            callbacks = self._callbacks.pop(video_id, [])
+        for callback in callbacks:
+            callback(image)
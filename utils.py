@@ -3,22 +3,35 @@ import subprocess
 import sys
 import os
 import webbrowser
+import importlib.metadata
 
-def install_requirements():
-    required_packages = [
-        'customtkinter',
-        'python-vlc',
-        'yt-dlp',
-        'beautifulsoup4',
-        'requests',
-        'pillow'
-    ]
-    print("Checking and installing required packages...")
-    for package in required_packages:
+REQUIRED_PACKAGES = [
+    'customtkinter',
+    'python-vlc',
+    'yt-dlp',
+    'requests',
+    'pillow'
+]
+
+def missing_requirements():
+    """Packages without installed metadata; no pip process is started"""
+    missing = []
+    for package in REQUIRED_PACKAGES:
         try:
-            subprocess.check_call([sys.executable, "-m", "pip", "install", package])
-        except:
-            print(f"Failed to install {package}")
+            importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            missing.append(package)
+    return missing
+
+def install_requirements():
+    missing = missing_requirements()
+    if not missing:
+        return
+    print(f"Installing missing packages: {', '.join(missing)}")
+    try:
+        subprocess.check_call([sys.executable, "-m", "pip", "install", *missing])
+    except subprocess.CalledProcessError:
+        print(f"Failed to install {', '.join(missing)}")
 
 def check_vlc():
     vlc_path = r"C:\Program Files\VideoLAN\VLC"